@@ -0,0 +1,94 @@
+"""
+Hit rate and score drift of the semantic answer cache.
+
+Every answer in the corpus is graded fresh by the LLM once (needs
+GEMINI_API_KEY). The answers are then replayed in order through a
+SemanticAnswerCache at each threshold: a miss stores the fresh grade, a hit
+is compared with the fresh grade of that same answer. Drift is the absolute
+score difference on hits, i.e. how wrong a reused grade would have been.
+
+The questions come from the fixed corpus, not from the model, so they are
+an approximation of a live session. Repeated subtopics are worded
+differently in the corpus, as the app would word them, and by default the
+cache is partitioned by subtopic and level as in the app, with a hit
+needing a similar question as well as a similar answer. `--key question`
+partitions on question text instead, which almost never repeats live; its
+hit rate here is an upper bound, not an estimate.
+
+Usage:
+    python benchmarks/answer_cache_eval.py [--thresholds 0.9,0.93,0.95,0.97]
+        [--key topic|question]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+from answer_cache import SemanticAnswerCache, normalize_question  # noqa: E402
+from enhanced_evaluate import EnhancedEvaluator  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(HERE, "data", "answers.jsonl")
+UNCACHEABLE = ("clarification_request", "zero_knowledge", "error")
+
+
+def topic_of(row):
+    """(subtopic, level) a corpus question was written for, as TurnPipeline passes it."""
+    level = re.match(r"\s*L([+-]?\d+):", row["question"])
+    return row["subtopic"], int(level.group(1)) if level else 0
+
+
+def replay(items, grades, vectors, question_vectors, threshold, topics):
+    cache = SemanticAnswerCache(threshold=threshold, embed=lambda _: None)
+    drift = []
+    for (question, answer), fresh, vector, question_vector, topic in zip(
+            items, grades, vectors, question_vectors, topics):
+        if fresh[3] in UNCACHEABLE:
+            continue
+        cached = cache.lookup(question, answer, vector=vector, topic=topic, question_vector=question_vector)
+        if cached is None:
+            cache.store(question, answer, fresh, vector=vector, topic=topic, question_vector=question_vector)
+        else:
+            drift.append(abs(cached[0] - fresh[0]))
+    stats = cache.stats()
+    return {
+        "threshold": threshold,
+        "lookups": stats["hits"] + stats["misses"],
+        "hits": stats["hits"],
+        "hit_rate": round(stats["hit_rate"], 3),
+        "mean_abs_drift": round(statistics.mean(drift), 2) if drift else 0.0,
+        "max_abs_drift": max(drift, default=0),
+        "llm_calls_saved": stats["hits"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--thresholds", default="0.9,0.93,0.95,0.97")
+    parser.add_argument("--key", choices=["topic", "question"], default="topic",
+                        help="cache key: subtopic and level (as in the app) or question text")
+    args = parser.parse_args()
+
+    with open(args.corpus, "r") as file:
+        rows = [json.loads(line) for line in file if line.strip()]
+    items = [(row["question"], row["answer"]) for row in rows]
+    topics = [topic_of(row) if args.key == "topic" else None for row in rows]
+
+    evaluator = EnhancedEvaluator(answer_cache=None)  # always grade fresh here
+    grades = [evaluator.evaluate_answer(answer, question) for question, answer in items]
+
+    embedder = SemanticAnswerCache()
+    vectors = [embedder.embed(answer) for _, answer in items]
+    question_vectors = [embedder.embed(normalize_question(question)) for question, _ in items]
+
+    for threshold in (float(t) for t in args.thresholds.split(",")):
+        print(json.dumps(replay(items, grades, vectors, question_vectors, threshold, topics)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Memory held by ChatHistory over a long interview, compared with a plain list.
+
+Usage:
+    python benchmarks/chat_history.py [--turns 2000] [--max-messages 40]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from chat_history import ChatHistory  # noqa: E402
+
+QUESTION = "L+1: How does dropout help prevent overfitting in neural networks? " * 2
+ANSWER = ("Dropout randomly turns off a fraction of neurons during each training step, which stops "
+          "the network from relying on specific co-adapted features. ") * 3
+
+
+def messages(turns):
+    for i in range(turns):
+        yield {"role": "assistant", "content": f"{QUESTION} #{i}", "evaluate": True, "streamed": True}
+        yield {"role": "user", "content": f"{ANSWER} #{i}"}
+
+
+def measure(history, turns, checkpoints):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    samples = []
+    for n, message in enumerate(messages(turns), start=1):
+        history.append(message)
+        if n // 2 in checkpoints and n % 2 == 0:
+            samples.append((n // 2, tracemalloc.get_traced_memory()[0] - base))
+    tracemalloc.stop()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--max-messages", type=int, default=40)
+    args = parser.parse_args()
+
+    checkpoints = {args.turns // 8, args.turns // 4, args.turns // 2, args.turns}
+    history = ChatHistory(max_messages=args.max_messages)
+    bounded = measure(history, args.turns, checkpoints)
+    assert sum(1 for _ in history) == 2 * args.turns
+    history.close()
+    unbounded = measure([], args.turns, checkpoints)
+
+    print(f"{'turns':>6} {'ChatHistory KiB':>16} {'list KiB':>10}")
+    for (turns, ring), (_, plain) in zip(bounded, unbounded):
+        print(f"{turns:>6} {ring / 1024:>16.1f} {plain / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Accuracy, memory and latency of the KeyBERT embedding backends.
+
+Each backend (fp32, int8, onnx) is measured in a fresh subprocess so that
+peak RSS reflects only that model. Keywords from the optimized backends are
+compared with the fp32 reference; the script exits non-zero if the mean
+keyword overlap of any backend falls below --min-overlap.
+
+Usage:
+    python benchmarks/embedding_backends.py [--backends fp32,int8,onnx]
+        [--threads N] [--min-overlap 0.8] [--repeat N] [--json]
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+DEFAULT_CORPUS = os.path.join(HERE, "data", "answers.jsonl")
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(corpus, repeat):
+    """Runs inside the subprocess; the backend comes from the environment."""
+    with open(corpus, "r") as file:
+        texts = [json.loads(line)["answer"] for line in file if line.strip()]
+
+    baseline_rss = peak_rss_mb()
+    import keywordextractor
+
+    start = time.perf_counter()
+    keywordextractor.extract_keywords(texts[0], backend="keybert")
+    load_seconds = time.perf_counter() - start
+
+    keywords = [keywordextractor.extract_keywords(t, backend="keybert") for t in texts]
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            keywordextractor.extract_keywords(text, backend="keybert")
+        runs.append((time.perf_counter() - start) / len(texts))
+
+    print(json.dumps({
+        "load_seconds": round(load_seconds, 2),
+        "latency_ms_per_answer": round(1000 * statistics.median(runs), 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "model_rss_mb": round(peak_rss_mb() - baseline_rss, 1),
+        "keywords": keywords,
+    }))
+
+
+def measure(backend, threads, corpus, repeat):
+    env = dict(os.environ, KEYBERT_EMBEDDING_BACKEND=backend, KEYBERT_NUM_THREADS=str(threads))
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", "--corpus", corpus, "--repeat", str(repeat)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    # Library warnings can end up on stdout; the report is the last line.
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def keyword_overlap(reference, candidate):
+    """Mean Jaccard overlap of per-answer keyword sets."""
+    scores = []
+    for ref, cand in zip(reference, candidate):
+        ref, cand = set(ref), set(cand)
+        scores.append(1.0 if not ref and not cand else len(ref & cand) / len(ref | cand))
+    return statistics.mean(scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", default="fp32,int8,onnx")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--min-overlap", type=float, default=0.8)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.corpus, args.repeat)
+        return
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    if "fp32" not in backends:
+        backends.insert(0, "fp32")
+
+    results = {b: measure(b, args.threads, args.corpus, args.repeat) for b in backends}
+    reference = results["fp32"]["keywords"]
+
+    report = {}
+    failed = []
+    for backend, result in results.items():
+        overlap = keyword_overlap(reference, result.pop("keywords"))
+        result["keyword_overlap_vs_fp32"] = round(overlap, 3)
+        report[backend] = result
+        if overlap < args.min_overlap:
+            failed.append(backend)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'backend':<8} {'overlap':>8} {'ms/answer':>10} {'model MB':>9} {'peak MB':>8} {'load s':>7}")
+        for backend, r in report.items():
+            print(f"{backend:<8} {r['keyword_overlap_vs_fp32']:>8} {r['latency_ms_per_answer']:>10} "
+                  f"{r['model_rss_mb']:>9} {r['peak_rss_mb']:>8} {r['load_seconds']:>7}")
+
+    if failed:
+        print(f"Keyword overlap below {args.min_overlap}: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
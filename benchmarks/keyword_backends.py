@@ -0,0 +1,107 @@
+"""
+Compare the KeyBERT and spaCy keyword backends on the recorded answer corpus.
+
+Quality is measured against KeyBERT, since that is what the app ships with
+today: for every answer we report how many of the KeyBERT keywords the spaCy
+backend also found (exact phrase match and word-level overlap). Latency is
+reported per answer for KeyBERT and for spaCy both one-at-a-time and batched
+through `extract_keywords_batch`.
+
+Usage:
+    python benchmarks/keyword_backends.py [--corpus PATH] [--repeat N] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from keywordextractor import extract_keywords, extract_keywords_batch  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "answers.jsonl")
+
+
+def load_corpus(path):
+    with open(path, "r") as file:
+        return [json.loads(line)["answer"] for line in file if line.strip()]
+
+
+def time_per_text(fn, texts, repeat):
+    """Median seconds per text over `repeat` passes of the corpus."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(texts)
+        runs.append((time.perf_counter() - start) / len(texts))
+    return statistics.median(runs)
+
+
+def word_overlap(reference, candidate):
+    ref_words = {w for kw in reference for w in kw.lower().split()}
+    cand_words = {w for kw in candidate for w in kw.lower().split()}
+    if not ref_words:
+        return 1.0 if not cand_words else 0.0
+    return len(ref_words & cand_words) / len(ref_words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    texts = load_corpus(args.corpus)
+
+    # Warm both models up so load time does not count as latency.
+    extract_keywords(texts[0], backend="keybert")
+    extract_keywords(texts[0], backend="spacy")
+
+    keybert_out = [extract_keywords(t, backend="keybert") for t in texts]
+    spacy_out = extract_keywords_batch(texts, backend="spacy")
+
+    phrase_recall = []
+    for ref, cand in zip(keybert_out, spacy_out):
+        if ref:
+            phrase_recall.append(len(set(ref) & set(cand)) / len(ref))
+
+    report = {
+        "corpus_size": len(texts),
+        "quality_vs_keybert": {
+            "phrase_recall": round(statistics.mean(phrase_recall), 3) if phrase_recall else None,
+            "word_overlap": round(statistics.mean(
+                word_overlap(r, c) for r, c in zip(keybert_out, spacy_out)), 3),
+            "empty_keybert": sum(1 for r in keybert_out if not r),
+            "empty_spacy": sum(1 for c in spacy_out if not c),
+        },
+        "latency_ms_per_answer": {
+            "keybert": round(1000 * time_per_text(
+                lambda ts: [extract_keywords(t, backend="keybert") for t in ts], texts, args.repeat), 2),
+            "spacy": round(1000 * time_per_text(
+                lambda ts: [extract_keywords(t, backend="spacy") for t in ts], texts, args.repeat), 2),
+            "spacy_batched": round(1000 * time_per_text(
+                lambda ts: extract_keywords_batch(ts, backend="spacy"), texts, args.repeat), 2),
+        },
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Corpus: {report['corpus_size']} answers")
+    for name, value in report["quality_vs_keybert"].items():
+        print(f"  {name:<16} {value}")
+    for name, value in report["latency_ms_per_answer"].items():
+        print(f"  {name:<16} {value} ms/answer")
+    print()
+    for text, ref, cand in zip(texts, keybert_out, spacy_out):
+        print(f"- {text[:60]}...")
+        print(f"    keybert: {ref}")
+        print(f"    spacy:   {cand}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Keyword-extraction throughput in 1, 2, 4 and 8 processes versus threads.
+
+Keyword extraction is the CPU-bound part of a turn that serializes in a
+single Streamlit process. For each count the recorded answers are pushed
+through extract_keywords by N processes of a multiprocessing pool (each with
+its own KeyBERT model, as each serve.py worker has) and, for comparison, by
+N threads in one process. This is an upper bound on what extra workers buy
+for that stage; it does not start serve.py, the router or any Streamlit
+worker, and does not measure end-to-end requests.
+
+Usage:
+    python benchmarks/keyword_process_scaling.py [--workers 1,2,4,8] [--rounds 4]
+        [--threads-per-worker 1] [--backend keybert]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..", "src")
+sys.path.insert(0, SRC)
+
+DEFAULT_CORPUS = os.path.join(HERE, "data", "answers.jsonl")
+
+
+def _init_worker(backend, corpus_first):
+    sys.path.insert(0, SRC)
+    import keywordextractor
+    keywordextractor.extract_keywords(corpus_first, backend=backend)  # load the model before timing
+
+
+def _extract(args):
+    text, backend = args
+    import keywordextractor
+    return keywordextractor.extract_keywords(text, backend=backend)
+
+
+def processes_throughput(n, texts, backend):
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(n, initializer=_init_worker, initargs=(backend, texts[0])) as pool:
+        pool.map(_extract, [(t, backend) for t in texts[:n]])  # make sure every worker is up
+        start = time.perf_counter()
+        pool.map(_extract, [(t, backend) for t in texts], chunksize=1)
+        return len(texts) / (time.perf_counter() - start)
+
+
+def threads_throughput(n, texts, backend):
+    import keywordextractor
+    keywordextractor.extract_keywords(texts[0], backend=backend)
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda t: keywordextractor.extract_keywords(t, backend=backend), texts))
+        return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--rounds", type=int, default=4, help="passes over the corpus per measurement")
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--backend", default="keybert")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    # Same setting serve.py gives its workers; inherited by the spawned processes.
+    os.environ["KEYBERT_NUM_THREADS"] = str(args.threads_per_worker)
+
+    with open(args.corpus, "r") as file:
+        answers = [json.loads(line)["answer"] for line in file if line.strip()]
+    texts = answers * args.rounds
+
+    report = []
+    for n in (int(w) for w in args.workers.split(",")):
+        report.append({
+            "workers": n,
+            "processes_answers_per_sec": round(processes_throughput(n, texts, args.backend), 1),
+            "threads_answers_per_sec": round(threads_throughput(n, texts, args.backend), 1),
+        })
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    base = report[0]["processes_answers_per_sec"]
+    print(f"CPUs: {os.cpu_count()}  backend: {args.backend}  answers per run: {len(texts)}")
+    print(f"{'workers':>7} {'processes/s':>12} {'speedup':>8} {'threads/s':>10}")
+    for row in report:
+        print(f"{row['workers']:>7} {row['processes_answers_per_sec']:>12} "
+              f"{row['processes_answers_per_sec'] / base:>7.2f}x {row['threads_answers_per_sec']:>10}")
+
+
+if __name__ == "__main__":
+    main()
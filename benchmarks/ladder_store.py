@@ -0,0 +1,50 @@
+"""
+Memory and batch-transition throughput of LadderStore at many sessions.
+
+Usage:
+    python benchmarks/ladder_store.py [--sessions 100000] [--subtopics 500]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from ladder_store import LadderStore  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--subtopics", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    store = LadderStore()
+    session_ids = [f"session-{i}" for i in range(args.sessions)]
+    for session_id in session_ids:
+        row = store.add_session(session_id)
+        store.set_subtopic(row, f"subtopic-{rng.randrange(args.subtopics)}")
+
+    usage = store.memory_usage()
+    print(f"sessions:           {usage['sessions']}")
+    print(f"array bytes:        {usage['array_bytes']}")
+    print(f"index bytes:        {usage['index_bytes']}")
+    print(f"subtopic bytes:     {usage['subtopic_bytes']}")
+    print(f"bytes per session:  {usage['bytes_per_session']:.1f}")
+
+    batch = rng.sample(session_ids, min(args.batch, len(session_ids)))
+    for name, op in (("go_up", store.go_up), ("go_down", store.go_down), ("reset", store.reset)):
+        start = time.perf_counter()
+        for _ in range(10):
+            op(batch)
+        elapsed = (time.perf_counter() - start) / 10
+        print(f"{name:<8} {len(batch)} sessions in {elapsed * 1000:.2f} ms "
+              f"({elapsed / len(batch) * 1e9:.0f} ns/session)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Microbenchmarks for the pure-CPU paths around the LLM calls.
+
+Every model (Gemini and, unless --real-keybert is given, KeyBERT) is replaced
+by a deterministic stub, so the numbers measure only this repo's code. Each
+benchmark runs a fixed number of operations, repeated; the median time and
+the peak traced allocation per operation are reported as JSON.
+
+Usage:
+    python benchmarks/microbench.py                       # print results
+    python benchmarks/microbench.py --save baseline.json  # record a baseline
+    python benchmarks/microbench.py --baseline baseline.json [--tolerance 0.15]
+        [--alloc-tolerance 0.25]
+        # compare; exits 1 if any benchmark is slower, or allocates more at
+        # peak, than the baseline by more than the tolerance
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import zlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import keywordextractor  # noqa: E402
+from chat_render import chat_bubble_html, typing_frames  # noqa: E402
+from enhanced_chatbot import EnhancedChatbot  # noqa: E402
+from enhanced_evaluate import EnhancedEvaluator  # noqa: E402
+from model_router import ModelRouter, TIER_ORDER  # noqa: E402
+from enhanced_memory import EnhancedKeywordMemory  # noqa: E402
+from ladder_tracker import LadderTracker  # noqa: E402
+from topic_graph import TopicGraph  # noqa: E402
+
+GRADE_RESPONSE = """Score: 72
+Feedback: Good start! You correctly explained that overfitting means the model
+memorizes the training data. To make it perfect, also mention how to detect it
+by comparing training and validation loss.
+Answer: Overfitting happens when a model fits noise in the training data and
+fails to generalize. It shows up as low training error but high validation
+error, and is reduced with regularization, dropout, early stopping or more data.
+"""
+
+ANSWER_WORDS = ("overfitting model training data validation regularization dropout neural "
+                "network gradient descent learning rate batch normalization feature scaling "
+                "cross validation precision recall").split()
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """Stands in for genai.GenerativeModel; returns canned text instantly."""
+
+    def generate_content(self, prompt, stream=False):
+        return _Response("Can you explain how dropout reduces overfitting?")
+
+
+class StubKeyBERT:
+    """Stands in for KeyBERT; picks the longest words, deterministically."""
+
+    def extract_keywords(self, text, **kwargs):
+        words = sorted(set(text.lower().split()), key=lambda w: (-len(w), w))
+        return [(w, 0.5) for w in words[:kwargs.get("top_n", 3)]]
+
+
+def stub_embed(texts):
+    """Stands in for the embedding model; a fixed pseudo-random unit vector per text."""
+    vectors = np.empty((len(texts), 32), dtype=np.float32)
+    for i, text in enumerate(texts):
+        vector = np.random.default_rng(zlib.crc32(text.encode("utf-8"))).standard_normal(32)
+        vectors[i] = vector / np.linalg.norm(vector)
+    return vectors
+
+
+def make_text(n_words, seed=0):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(ANSWER_WORDS) for _ in range(n_words))
+
+
+def stub_router():
+    return ModelRouter(models={tier: StubModel() for tier in TIER_ORDER})
+
+
+def make_chatbot():
+    chatbot = EnhancedChatbot(router=stub_router())
+    # Unseen subtopics are matched with the stub embedding, inline so the
+    # timing does not depend on a background thread.
+    chatbot.topic_graph = TopicGraph.load(embed=stub_embed, background=False)
+    chatbot.session_started = True
+    chatbot.initial_seeding_done = True
+    return chatbot
+
+
+# --- Benchmarks: each returns a zero-argument callable doing one operation ---
+
+def bench_parse_evaluation():
+    evaluator = EnhancedEvaluator(router=stub_router())
+    return lambda: evaluator._parse_evaluation(GRADE_RESPONSE, "answer", "question", None)
+
+
+def bench_extract_keywords(n_words):
+    text = make_text(n_words)
+    return lambda: keywordextractor.extract_keywords(text, backend="keybert")
+
+
+def bench_ladder_transitions():
+    tracker = LadderTracker()
+    def op():
+        tracker.go_up_ladder()
+        tracker.go_down_ladder()
+        tracker.go_down_ladder()
+        tracker.assign_subtopic("overfitting", reset=True)
+        tracker.get_status()
+    return op
+
+
+def bench_topic_merge():
+    chatbot = make_chatbot()
+    extracted = [[f"topic {i}", f"topic {i + 1}", f"concept {i % 7}"] for i in range(20)]
+    def op():
+        chatbot.topic_queue = [('initial', 'machine learning'), ('initial', 'databases')]
+        chatbot._merge_extracted_topics(extracted)
+    return op
+
+
+def bench_contextual_question():
+    chatbot = make_chatbot()
+    topics = [('user_mentioned', f"topic {i}") for i in range(30)]
+    scores = [75, 40, 90, 55, None]
+    state = {'i': 0}
+    def op():
+        if len(chatbot.topic_queue) < 5:
+            chatbot.topic_queue = list(topics)
+        state['i'] += 1
+        chatbot._generate_contextual_question([], scores[state['i'] % len(scores)])
+    return op
+
+
+def bench_memory_lookups():
+    memory = EnhancedKeywordMemory()
+    for c in range(20):
+        memory.add_keywords([f"kw{c}-{k}" for k in range(10)], concept=f"concept{c}")
+    text = " ".join(f"kw{c}-{c % 10}" for c in range(20)) + " " + make_text(60)
+    def op():
+        memory.asked_keywords.clear()
+        memory.get_unused_keyword(prefer_concept="concept7")
+        memory.get_unused_keyword()
+        memory.identify_concept_from_text(text)
+        memory.get_concept_keywords("concept3")
+    return op
+
+
+def bench_chat_html(n_messages):
+    history = [("user" if i % 2 else "assistant", make_text(40, seed=i)) for i in range(n_messages)]
+    def op():
+        return [chat_bubble_html(role, text) for role, text in history]
+    return op
+
+
+def bench_typing_frames():
+    content = "L+1: " + make_text(40)
+    return lambda: list(typing_frames(content))
+
+
+BENCHMARKS = {
+    "parse_evaluation": (bench_parse_evaluation, 20000),
+    "extract_keywords_20w": (lambda: bench_extract_keywords(20), 5000),
+    "extract_keywords_100w": (lambda: bench_extract_keywords(100), 2000),
+    "extract_keywords_500w": (lambda: bench_extract_keywords(500), 500),
+    "ladder_transitions": (bench_ladder_transitions, 20000),
+    "topic_queue_merge": (bench_topic_merge, 5000),
+    "contextual_question": (bench_contextual_question, 5000),
+    "keyword_memory_lookups": (bench_memory_lookups, 5000),
+    "chat_html_20_messages": (lambda: bench_chat_html(20), 5000),
+    "chat_html_200_messages": (lambda: bench_chat_html(200), 500),
+    "typing_frames_40w": (bench_typing_frames, 5000),
+}
+
+
+def run_benchmark(factory, iterations, repeat):
+    random.seed(0)
+    op = factory()
+    for _ in range(min(iterations, 100)):
+        op()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            op()
+        timings.append((time.perf_counter() - start) / iterations)
+
+    sample = max(1, iterations // 10)
+    tracemalloc.start()
+    for _ in range(sample):
+        op()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        "iterations": iterations,
+        "median_us": round(median * 1e6, 3),
+        "ops_per_sec": round(1 / median, 1) if median else None,
+        "spread": round((max(timings) - min(timings)) / median, 3) if median else 0.0,
+        "peak_alloc_bytes": peak,
+    }
+
+
+def _change(new, old):
+    return new / old - 1 if old else 0.0
+
+
+def compare(results, baseline, tolerance, alloc_tolerance):
+    regressions = []
+    print(f"{'benchmark':<26} {'baseline us':>12} {'now us':>10} {'change':>8} "
+          f"{'baseline B':>11} {'now B':>9} {'change':>8}")
+    for name, result in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            print(f"{name:<26} {'-':>12} {result['median_us']:>10} {'new':>8} "
+                  f"{'-':>11} {result['peak_alloc_bytes']:>9} {'new':>8}")
+            continue
+        time_change = _change(result["median_us"], old["median_us"])
+        alloc_change = _change(result["peak_alloc_bytes"], old["peak_alloc_bytes"])
+        flags = []
+        if time_change > tolerance:
+            regressions.append(f"{name} (time)")
+            flags.append("SLOWER")
+        if alloc_change > alloc_tolerance:
+            regressions.append(f"{name} (allocations)")
+            flags.append("MORE MEMORY")
+        print(f"{name:<26} {old['median_us']:>12} {result['median_us']:>10} {time_change:>+8.1%} "
+              f"{old['peak_alloc_bytes']:>11} {result['peak_alloc_bytes']:>9} {alloc_change:>+8.1%}"
+              + (f"  REGRESSION: {', '.join(flags)}" if flags else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", help="comma-separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply iteration counts")
+    parser.add_argument("--real-keybert", action="store_true", help="benchmark the real KeyBERT model")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown")
+    parser.add_argument("--alloc-tolerance", type=float, default=0.25,
+                        help="allowed growth of peak allocation per operation")
+    args = parser.parse_args()
+
+    if not args.real_keybert:
+        keywordextractor.kw_model = StubKeyBERT()
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    results = {}
+    for name in names:
+        factory, iterations = BENCHMARKS[name]
+        results[name] = run_benchmark(factory, max(1, int(iterations * args.scale)), args.repeat)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "real_keybert": args.real_keybert,
+        "results": results,
+    }
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance, args.alloc_tolerance)
+        if regressions:
+            print(f"Worse than baseline (time > {args.tolerance:.0%} or allocations > "
+                  f"{args.alloc_tolerance:.0%}): {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+    elif not args.save:
+        print(json.dumps(report, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Startup profile of the entry points: import time and time to the first prompt.
+
+For each entry script the top-level imports are read from its source and
+imported in a fresh interpreter under `python -X importtime`; the median
+total, the part above a bare interpreter, the slowest top-level imports and
+any heavy library loaded at import time (Gemini client, KeyBERT, torch,
+transformers, spaCy) are reported as JSON. For the CLI the wall-clock time
+from launch to the "You:" prompt is measured as well. No request is sent:
+a placeholder key is used when GEMINI_API_KEY is not set.
+
+Usage:
+    python benchmarks/startup_profile.py                       # print results
+    python benchmarks/startup_profile.py --save startup.json   # record a baseline
+    python benchmarks/startup_profile.py --baseline startup.json [--tolerance 0.25]
+        # compare; exits 1 if an entry point got slower by more than the
+        # tolerance or started importing a heavy library eagerly
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import select
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..", "src")
+
+ENTRY_POINTS = {
+    "cli": os.path.join(SRC, "enhanced_main.py"),
+    "streamlit_app": os.path.join(SRC, "streamlit_app.py"),
+    "run": os.path.join(SRC, "run.py"),
+}
+# Libraries that must only be imported when first needed (or by warm-up).
+HEAVY_MODULES = ["google.generativeai", "grpc", "keybert", "sentence_transformers",
+                 "transformers", "torch", "onnxruntime", "spacy"]
+PROMPT_MARKER = "You:".encode("utf-8")
+
+
+def top_level_imports(path):
+    """Modules imported at module level by the script at `path`, in order."""
+    with open(path, "r") as file:
+        tree = ast.parse(file.read(), path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def _env():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([SRC, os.environ.get("PYTHONPATH", "")]))
+    env.setdefault("GEMINI_API_KEY", "startup-profile-placeholder")
+    return env
+
+
+def import_profile(modules):
+    """One `-X importtime` run: (total us, {module: cumulative us} for top-level imports)."""
+    code = "".join(f"import {module}\n" for module in modules) or "pass\n"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=SRC, env=_env(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total, top, loaded = 0, {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        loaded.add(name.strip())
+        if not name.startswith("  "):
+            top[name.strip()] = int(cumulative_us)
+    return total, top, loaded
+
+
+def time_to_prompt(path, timeout=60.0):
+    """Seconds from launching `path` until it prints the input prompt."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-u", path], cwd=os.path.join(SRC, ".."), env=_env(),
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    output = b""
+    try:
+        while PROMPT_MARKER not in output:
+            remaining = timeout - (time.perf_counter() - start)
+            if remaining <= 0 or process.poll() is not None:
+                return None
+            ready, _, _ = select.select([process.stdout], [], [], remaining)
+            if ready:
+                output += os.read(process.stdout.fileno(), 4096)
+        return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+
+
+def profile_entry(path, repeat, top_n, interpreter_modules):
+    modules = top_level_imports(path)
+    import_profile(modules)  # fill the OS file cache before timing
+    runs = [import_profile(modules) for _ in range(repeat)]
+    totals = [total for total, _, _ in runs]
+    _, top, loaded = runs[-1]
+    return {
+        "imports": modules,
+        "import_ms": round(statistics.median(totals) / 1000, 1),
+        "slowest_imports_ms": [[name, round(us / 1000, 1)] for name, us in
+                               sorted(top.items(), key=lambda item: -item[1])
+                               if name not in interpreter_modules][:top_n],
+        "heavy_imported": [name for name in HEAVY_MODULES if name in loaded],
+    }
+
+
+def compare(report, baseline, tolerance):
+    regressions = []
+    print(f"{'entry point':<16} {'baseline ms':>12} {'now ms':>8} {'change':>8}")
+    for name, result in report["entry_points"].items():
+        old = baseline.get("entry_points", {}).get(name)
+        if result["heavy_imported"]:
+            regressions.append(f"{name} imports {', '.join(result['heavy_imported'])}")
+        if old is None:
+            print(f"{name:<16} {'-':>12} {result['app_import_ms']:>8} {'new':>8}")
+            continue
+        change = result["app_import_ms"] / old["app_import_ms"] - 1 if old["app_import_ms"] else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<16} {old['app_import_ms']:>12} {result['app_import_ms']:>8} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", help="comma-separated entry points: " + ",".join(ENTRY_POINTS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="slowest top-level imports to list")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    interpreter_runs = [import_profile([]) for _ in range(args.repeat)]
+    interpreter_ms = round(statistics.median(total for total, _, _ in interpreter_runs) / 1000, 1)
+    interpreter_modules = interpreter_runs[-1][2]
+    names = args.only.split(",") if args.only else list(ENTRY_POINTS)
+    results = {}
+    for name in names:
+        try:
+            result = profile_entry(ENTRY_POINTS[name], args.repeat, args.top, interpreter_modules)
+        except RuntimeError as e:
+            print(f"{name}: import failed: {e}", file=sys.stderr)
+            continue
+        result["app_import_ms"] = round(result["import_ms"] - interpreter_ms, 1)
+        results[name] = result
+    if "cli" in results:
+        seconds = time_to_prompt(ENTRY_POINTS["cli"])
+        results["cli"]["first_prompt_ms"] = round(seconds * 1000, 1) if seconds is not None else None
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "interpreter_import_ms": interpreter_ms,
+        "entry_points": results,
+    }
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"Startup regressions: {'; '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+    elif not args.save:
+        print(json.dumps(report, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+import os
+import re
+import threading
+
+import numpy as np
+
+# Off unless ANSWER_CACHE=1: a hit reuses another candidate's grade verbatim.
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE", "0").strip().lower() in ("1", "true", "yes")
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+# Questions in one subtopic and level differ; a grade is only reused for a
+# question at least this similar to the one it was given for.
+ANSWER_CACHE_QUESTION_THRESHOLD = float(os.getenv("ANSWER_CACHE_QUESTION_THRESHOLD", "0.9"))
+
+_LEVEL_PREFIX = re.compile(r"^\s*L[+-]?\d+:\s*")
+
+
+def normalize_question(question):
+    """Question text with the ladder label removed and case and whitespace folded."""
+    return " ".join(_LEVEL_PREFIX.sub("", question).lower().split())
+
+
+def cache_key(question, topic=None):
+    """
+    Partition of the cache an answer to `question` is looked up in.
+
+    Questions are worded afresh in every session, so exact question text
+    almost never repeats. When `topic` (the subtopic and ladder level the
+    question was generated for) is known it names the partition; the
+    normalized question text is only a fallback. Within a partition an answer
+    is only reused for a question similar to the one it was graded against.
+    """
+    if topic is not None and topic[0]:
+        subtopic, level = topic
+        return f"{' '.join(subtopic.lower().split())}@L{level}"
+    return normalize_question(question)
+
+
+class _TopicIndex:
+    """Unit-norm answer and question embeddings for one partition, with their grades."""
+
+    __slots__ = ('vectors', 'question_vectors', 'questions', 'results', 'last_used', 'size')
+
+    def __init__(self, capacity, dim):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.question_vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.questions = [None] * capacity
+        self.results = [None] * capacity
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+
+
+class SemanticAnswerCache:
+    """
+    Reuse grades for near-duplicate answers to the same question.
+
+    Answers are partitioned by `cache_key`: subtopic and level when the
+    caller passes `topic`, otherwise the question text. Each partition holds
+    a small matrix of answer embeddings and of the questions they answered.
+    A new answer gets a stored (score, feedback, correct_answer,
+    feedback_type) back only if its cosine similarity to the stored answer
+    is at least `threshold` and the two questions are at least
+    `question_threshold` similar. The stored reference answer is only
+    returned for the same question text; for a reworded question it is None
+    and the caller generates its own. Partitions are evicted
+    least-recently-used beyond `max_questions`, and answers within a
+    partition beyond `max_answers_per_question`.
+    """
+
+    def __init__(self, threshold=ANSWER_CACHE_THRESHOLD, max_questions=512,
+                 max_answers_per_question=32, embed=None,
+                 question_threshold=ANSWER_CACHE_QUESTION_THRESHOLD):
+        self.threshold = threshold
+        self.question_threshold = question_threshold
+        self.max_questions = max_questions
+        self.max_answers_per_question = max_answers_per_question
+        self._embed = embed or _embed_with_keybert_model
+        self._questions = OrderedDict()
+        self._lock = threading.Lock()
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, text):
+        vector = np.asarray(self._embed(text), dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, question, answer, vector=None, topic=None, question_vector=None):
+        """Return the cached grade for a near-duplicate answer to a similar question, or None."""
+        key = cache_key(question, topic)
+        if vector is None:
+            vector = self.embed(answer)
+        if question_vector is None:
+            question_vector = self.embed(normalize_question(question))
+        with self._lock:
+            index = self._questions.get(key)
+            if index is None or index.size == 0:
+                self.misses += 1
+                return None
+            self._questions.move_to_end(key)
+            similarities = index.vectors[:index.size] @ vector
+            same_question = index.question_vectors[:index.size] @ question_vector >= self.question_threshold
+            similarities[~same_question] = -np.inf
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+            self._clock += 1
+            index.last_used[best] = self._clock
+            self.hits += 1
+            score, feedback, correct_answer, feedback_type = index.results[best]
+            if index.questions[best] != normalize_question(question):
+                correct_answer = None
+            return score, feedback, correct_answer, feedback_type
+
+    def store(self, question, answer, result, vector=None, topic=None, question_vector=None):
+        """Remember the grade `result` for `answer` to `question`."""
+        key = cache_key(question, topic)
+        if vector is None:
+            vector = self.embed(answer)
+        if question_vector is None:
+            question_vector = self.embed(normalize_question(question))
+        with self._lock:
+            index = self._questions.get(key)
+            if index is None:
+                index = self._questions[key] = _TopicIndex(self.max_answers_per_question, len(vector))
+                if len(self._questions) > self.max_questions:
+                    self._questions.popitem(last=False)
+            else:
+                self._questions.move_to_end(key)
+
+            if index.size < self.max_answers_per_question:
+                slot = index.size
+                index.size += 1
+            else:
+                slot = int(np.argmin(index.last_used))
+            self._clock += 1
+            index.vectors[slot] = vector
+            index.question_vectors[slot] = question_vector
+            index.questions[slot] = normalize_question(question)
+            index.results[slot] = tuple(result)
+            index.last_used[slot] = self._clock
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'questions': len(self._questions),
+            'answers': sum(index.size for index in self._questions.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _embed_with_keybert_model(text):
+    from keywordextractor import get_embedding_model
+    return get_embedding_model().encode(text, normalize_embeddings=True)
+
+
+_default_cache = None
+
+
+def default_answer_cache():
+    """Process-wide cache shared by every evaluator, or None when disabled."""
+    global _default_cache
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    if _default_cache is None:
+        _default_cache = SemanticAnswerCache()
+    return _default_cache
@@ -0,0 +1,77 @@
+"""
+Build or extend the offline prerequisite graph used for remedial questions.
+
+For each subtopic the model is asked once for its most important
+prerequisites and related concepts; the answers are merged into
+data/topic_graph.json. Existing nodes are kept unless --refresh is given,
+so hand edits to the file survive a rebuild.
+
+Usage:
+    python src/build_topic_graph.py "rest api" "docker" ...
+    python src/build_topic_graph.py --from-file subtopics.txt [--refresh]
+"""
+import argparse
+import json
+import os
+
+from gemini_client import get_genai
+from topic_graph import TOPIC_GRAPH_PATH
+
+PROMPT = """You are building a study map for technical interview preparation.
+
+Subtopic: "{subtopic}"
+
+Return JSON only, with exactly these keys:
+- "prerequisites": up to 3 concepts a learner must understand first, most important first. Each should be simpler than the subtopic.
+- "related": up to 3 concepts at a similar level that an interviewer would naturally move on to.
+- "aliases": up to 3 other common names or abbreviations for the subtopic.
+Use short lowercase noun phrases (1-4 words)."""
+
+
+def ask(model, subtopic):
+    response = model.generate_content(
+        PROMPT.format(subtopic=subtopic),
+        generation_config={"response_mime_type": "application/json"},
+    )
+    data = json.loads(response.text)
+    return {key: [str(v).strip().lower() for v in data.get(key, [])][:3]
+            for key in ("prerequisites", "related", "aliases")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("subtopics", nargs="*")
+    parser.add_argument("--from-file", help="one subtopic per line")
+    parser.add_argument("--output", default=TOPIC_GRAPH_PATH)
+    parser.add_argument("--refresh", action="store_true", help="regenerate nodes that already exist")
+    parser.add_argument("--model", default="gemini-2.5-flash")
+    args = parser.parse_args()
+
+    model = get_genai().GenerativeModel(args.model)
+
+    graph = {"version": 1, "nodes": {}}
+    if os.path.exists(args.output):
+        with open(args.output, "r") as file:
+            graph = json.load(file)
+
+    subtopics = [s.strip().lower() for s in args.subtopics]
+    if args.from_file:
+        with open(args.from_file, "r") as file:
+            subtopics += [line.strip().lower() for line in file if line.strip()]
+
+    for subtopic in subtopics:
+        if subtopic in graph["nodes"] and not args.refresh:
+            continue
+        try:
+            graph["nodes"][subtopic] = ask(model, subtopic)
+            print(f"✅ {subtopic}: {graph['nodes'][subtopic]['prerequisites']}")
+        except Exception as e:
+            print(f"❌ {subtopic}: {e}")
+
+    with open(args.output, "w") as file:
+        json.dump(graph, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+from array import array
+from collections import deque
+import json
+import mmap
+import os
+import tempfile
+import threading
+
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "40"))
+CHAT_HISTORY_DIR = os.getenv("CHAT_HISTORY_DIR") or None
+
+
+class ChatMessage:
+    """
+    One chat message. Behaves like the plain dicts the app used before
+    (`message["content"]`, `message.get("evaluate", True)`), without
+    carrying a per-message dict.
+    """
+
+    __slots__ = ('role', 'content', 'evaluate', 'streamed')
+
+    def __init__(self, role, content, evaluate=True, streamed=True):
+        self.role = role
+        self.content = content
+        self.evaluate = evaluate
+        self.streamed = streamed
+
+    @classmethod
+    def from_dict(cls, message):
+        if isinstance(message, ChatMessage):
+            return message
+        return cls(message["role"], message["content"],
+                   message.get("evaluate", True), message.get("streamed", True))
+
+    def to_dict(self):
+        return {"role": self.role, "content": self.content,
+                "evaluate": self.evaluate, "streamed": self.streamed}
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def __repr__(self):
+        return f"ChatMessage({self.role!r}, {self.content[:40]!r})"
+
+
+class ChatHistory:
+    """
+    Chat history that keeps only the last `max_messages` messages in memory.
+
+    Older messages are appended to a per-session segment file, one JSON
+    record per line, and read back through a memory map. Memory stays flat
+    apart from an 8-byte offset per archived message. Iteration yields the
+    archived messages first, then the in-memory ones, so renderers, context
+    builders and exports see the full conversation in order.
+    """
+
+    def __init__(self, max_messages=CHAT_HISTORY_MAX_MESSAGES, directory=CHAT_HISTORY_DIR):
+        self.max_messages = max_messages
+        self._live = deque()
+        self._offsets = array('Q')  # byte offset of each archived message
+        self._lock = threading.Lock()
+        fd, self.path = tempfile.mkstemp(prefix="chat-", suffix=".jsonl", dir=directory)
+        self._segment = os.fdopen(fd, "ab")
+        self._map = None
+
+    def append(self, message):
+        message = ChatMessage.from_dict(message)
+        with self._lock:
+            self._live.append(message)
+            while len(self._live) > self.max_messages:
+                self._archive(self._live.popleft())
+        return message
+
+    def _archive(self, message):
+        self._offsets.append(self._segment.tell())
+        record = {"role": message.role, "content": message.content, "evaluate": message.evaluate}
+        self._segment.write(json.dumps(record).encode("utf-8") + b"\n")
+
+    def _read_archived(self, index):
+        if self._map is None or len(self._map) < self._segment.tell():
+            self._segment.flush()
+            if self._map is not None:
+                self._map.close()
+            with open(self.path, "rb") as file:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        start = self._offsets[index]
+        end = self._map.find(b"\n", start)
+        record = json.loads(self._map[start:end])
+        return ChatMessage(record["role"], record["content"], record["evaluate"], True)
+
+    def __len__(self):
+        return len(self._offsets) + len(self._live)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        with self._lock:
+            total = len(self._offsets) + len(self._live)
+            if index < 0:
+                index += total
+            if not 0 <= index < total:
+                raise IndexError("chat history index out of range")
+            if index < len(self._offsets):
+                return self._read_archived(index)
+            return self._live[index - len(self._offsets)]
+
+    def __iter__(self):
+        yield from self.iter_archived()
+        yield from self.recent()
+
+    def __reversed__(self):
+        yield from reversed(self.recent())
+        for index in range(len(self._offsets) - 1, -1, -1):
+            with self._lock:
+                message = self._read_archived(index)
+            yield message
+
+    def iter_archived(self):
+        """Archived messages, oldest first, read from the segment file."""
+        for index in range(len(self._offsets)):
+            with self._lock:
+                message = self._read_archived(index)
+            yield message
+
+    def recent(self, n=None):
+        """The newest `n` in-memory messages (all of them by default), oldest first."""
+        with self._lock:
+            live = list(self._live)
+        return live if n is None else live[-n:]
+
+    def export(self, path):
+        """Write the whole conversation to `path` as JSON lines."""
+        with open(path, "w") as file:
+            for message in self:
+                file.write(json.dumps({"role": message.role, "content": message.content}) + "\n")
+
+    def close(self, delete=True):
+        """Release the segment file; delete it unless `delete` is False."""
+        with self._lock:
+            if self._segment.closed:
+                return
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._segment.close()
+            if delete and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,12 @@
+def chat_bubble_html(role, text):
+    """HTML for one chat bubble, styled by the CSS in streamlit_app."""
+    css_class = "chat-bubble-user" if role == "user" else "chat-bubble-bot"
+    return f"<div class='{css_class}'>{text}</div>"
+
+
+def typing_frames(content):
+    """Bubble HTML for each step of the word-by-word typing effect."""
+    typed_text = ""
+    for word in content.split(" "):
+        typed_text += word + " "
+        yield chat_bubble_html("assistant", typed_text)
@@ -1,33 +1,38 @@
-from keywordextractor import extract_keywords
+from keyword_worker import BackgroundKeywordExtractor
 from ladder_tracker import LadderTracker
-import os
-from dotenv import load_dotenv
-import google.generativeai as genai
+from session_analytics import SessionAnalytics
+from topic_graph import default_topic_graph
+from model_router import ModelRouter
 import random
 
-# Load .env file
-load_dotenv()
+# Longest a subtopic switch waits for background keyword extraction when the
+# topic queue and the graph have nothing to offer.
+KEYWORD_WAIT_SECONDS = 0.3
 
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    raise ValueError("No API key found.")
-
-genai.configure(api_key=api_key)
+def _has_text(response):
+    return bool(response.text.strip())
 
 class EnhancedChatbot:
-    def __init__(self):
+    def __init__(self, router=None):
         self.ladder_tracker = LadderTracker()
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite') # Using stable model
+        # Picks the model tier per call type; share one router per session for accounting.
+        self.router = router if router is not None else ModelRouter()
         self.conversation_count = 0
         self.session_started = False
         self._last_feedback_type = None
         
         self.topic_queue = []
         self.initial_seeding_done = False
+        self.keyword_worker = BackgroundKeywordExtractor()
+        self.analytics = SessionAnalytics(self.ladder_tracker.session_id)
+        # Offline prerequisite/related-concept graph; None if the data file is missing.
+        self.topic_graph = default_topic_graph()
+        self.covered_subtopics = []
 
     def get_next_question(self, chat_history, last_score=None, last_concept=None):
         """Get the next question using the new bidirectional ladder and topic queue logic."""
         self.conversation_count += 1
+        self._merge_extracted_topics(self.keyword_worker.collect())
         
         if not self.session_started and chat_history:
             self._seed_initial_topics(chat_history[0]['content'])
@@ -62,7 +67,7 @@ Instructions:
 4. If no specific topics are found, return "None".
 Topics:
 """
-            response = self.model.generate_content(prompt)
+            response = self.router.generate('seed_topics', prompt, validate=_has_text)
             topics_str = response.text.strip()
             
             if topics_str.lower() != 'none':
@@ -77,16 +82,13 @@ Topics:
 
     def _generate_contextual_question(self, chat_history, last_score=None):
         """Generate a question based on the new bidirectional ladder and topic queue."""
-        current_status = self.ladder_tracker.get_status()
         topic_source = 'initial'
         
         if hasattr(self, '_last_feedback_type') and self._last_feedback_type == "zero_knowledge":
             self.ladder_tracker.reset_for_new_subtopic()
-            current_status = self.ladder_tracker.get_status()
 
-        if current_status['level'] > 0 and last_score is not None and last_score < 60:
+        if self.ladder_tracker.current_level > 0 and last_score is not None and last_score < 60:
             self.ladder_tracker.reset_for_new_subtopic()
-            current_status = self.ladder_tracker.get_status()
         elif last_score is not None:
             if last_score >= 60:
                 self.ladder_tracker.go_up_ladder()
@@ -94,6 +96,17 @@ Topics:
                 self.ladder_tracker.go_down_ladder()
         
         if not self.ladder_tracker.current_subtopic:
+            # With the queue empty, continue with a related concept from the graph.
+            if not self.topic_queue:
+                related_topic = self._next_related_topic()
+                if related_topic:
+                    self.topic_queue.append(('related', related_topic))
+
+            # Otherwise give background extraction (usually of this very answer)
+            # a short moment; whatever finishes later is merged on the next turn.
+            if not self.topic_queue and self.keyword_worker.pending_count():
+                self._merge_extracted_topics(self.keyword_worker.flush(timeout=KEYWORD_WAIT_SECONDS))
+
             # --- CHANGE 2: If queue is empty, return the object with the 'evaluate: False' flag. ---
             if not self.topic_queue:
                 return {
@@ -104,10 +117,12 @@ Topics:
             topic_source, topic_name = random.choice(self.topic_queue)
             self.topic_queue.remove((topic_source, topic_name))
             self.ladder_tracker.assign_subtopic(topic_name, reset=True)
+            self.covered_subtopics.append(topic_name)
+            if self.topic_graph is not None:
+                self.topic_graph.resolve(topic_name)  # map it onto the graph in the background
         
-        current_status = self.ladder_tracker.get_status()
-        level = current_status['level']
-        subtopic = current_status['subtopic']
+        level = self.ladder_tracker.current_level
+        subtopic = self.ladder_tracker.current_subtopic
         
         prompt_map = {
 
@@ -137,13 +152,20 @@ Topics:
         
         prompt = prompt_map.get(level, prompt_map[0])
         
+        # Remedial levels target a concrete prerequisite from the graph, so the
+        # model does not have to pick one (differently) on every struggling turn.
+        if level < 0 and self.topic_graph is not None:
+            prerequisite = self.topic_graph.prerequisite(subtopic, depth=-level)
+            if prerequisite:
+                prompt = self._remedial_prompt(level, subtopic, prerequisite)
+        
         if level == 0 and topic_source == 'user_mentioned':
             prompt = f"The user previously mentioned '{subtopic}'. Ask a foundational 'L0' question about it, starting with a phrase like 'You mentioned...'. CRITICAL: Ask only ONE, single, concise question."
         
         prompt += "\n\nCRITICAL: Ask only the question. Be direct and professional."
         
         try:
-            response = self.model.generate_content(prompt)
+            response = self.router.generate('question', prompt, level=level, validate=_has_text)
             question = response.text.strip()
             level_label = f"L{'+' if level > 0 else ''}{level}"
             question_content = f"{level_label}: {question}"
@@ -154,21 +176,94 @@ Topics:
         # --- CHANGE 3: All normal questions are now wrapped in a dictionary with 'evaluate: True'. ---
         return {'content': question_content, 'evaluate': True}
 
+    def _remedial_prompt(self, level, subtopic, prerequisite):
+        """Prompt for an L-1..L-3 question about a known prerequisite of `subtopic`."""
+        remedial_map = {
+            -1: f"The user is struggling with '{subtopic}'. Ask a simpler 'L-1' question about '{prerequisite}', a prerequisite concept for it. CRITICAL: Ask only ONE, single, concise question.",
+            
+            -2: f"The user needs more help. Ask a very simple 'L-2' definition-based question about '{prerequisite}'. CRITICAL: Ask only ONE, single, concise question.",
+            
+            -3: f"The user is at the most basic level. Ask an extremely simple 'L-3' confidence-building question (e.g., true/false or very short answer) about '{prerequisite}'. CRITICAL: Ask only ONE, single, concise question."
+        }
+        return remedial_map.get(level, remedial_map[-1])
+
+    def _next_related_topic(self):
+        """A graph neighbour of the most recent subtopics that has not been covered yet."""
+        if self.topic_graph is None:
+            return None
+        covered = {topic.lower() for topic in self.covered_subtopics}
+        for subtopic in reversed(self.covered_subtopics[-5:]):
+            for related_topic in self.topic_graph.related(subtopic):
+                if related_topic.lower() not in covered:
+                    return related_topic
+        return None
+
     def process_user_response(self, user_input, current_question=""):
         # If the evaluator flags a response as zero_knowledge, we won't extract keywords.
         if hasattr(self, '_last_feedback_type') and self._last_feedback_type == "zero_knowledge":
             return self.ladder_tracker.current_subtopic
             
 
-        new_keywords = extract_keywords(user_input)
-        for keyword in new_keywords[:3]:
-            if not any(keyword in item for item in self.topic_queue):
-                 self.topic_queue.append(('user_mentioned', keyword))
+        # Extraction runs in the background; the topics are merged into the
+        # queue at the start of a later turn.
+        self.keyword_worker.submit(user_input)
         
         return self.ladder_tracker.current_subtopic
+
+    def _merge_extracted_topics(self, keyword_lists):
+        """Add keywords from finished background extractions to the topic queue."""
+        for new_keywords in keyword_lists:
+            for keyword in new_keywords[:3]:
+                if not any(keyword in item for item in self.topic_queue):
+                     self.topic_queue.append(('user_mentioned', keyword))
+
+    def close(self):
+        """End the session: drain pending keyword extraction and stop the worker."""
+        self._merge_extracted_topics(self.keyword_worker.shutdown(timeout=5.0))
+
+    def to_state(self):
+        """JSON-serializable session state, for moving a session between processes."""
+        return {
+            'ladder': {
+                'subtopic': self.ladder_tracker.current_subtopic,
+                'level': self.ladder_tracker.current_level,
+            },
+            'conversation_count': self.conversation_count,
+            'session_started': self.session_started,
+            'last_feedback_type': self._last_feedback_type,
+            'topic_queue': [list(item) for item in self.topic_queue],
+            'initial_seeding_done': self.initial_seeding_done,
+            'covered_subtopics': list(self.covered_subtopics),
+            'analytics': self.analytics.to_state(),
+        }
+
+    def restore_state(self, state):
+        """Load state produced by `to_state` into this chatbot."""
+        self.ladder_tracker.current_subtopic = state['ladder']['subtopic']
+        self.ladder_tracker.current_level = state['ladder']['level']
+        self.conversation_count = state['conversation_count']
+        self.session_started = state['session_started']
+        self._last_feedback_type = state['last_feedback_type']
+        self.topic_queue = [tuple(item) for item in state['topic_queue']]
+        self.initial_seeding_done = state['initial_seeding_done']
+        self.covered_subtopics = list(state.get('covered_subtopics', []))
+        self.analytics = SessionAnalytics.from_state(state['analytics'])
     
     def get_progress_summary(self):
-        return { 'ladder_status': self.ladder_tracker.get_status() }
+        return {
+            'ladder_status': self.ladder_tracker.get_status(),
+            'analytics': self.analytics.summary(),
+        }
+
+    def record_turn(self, score, feedback_type, elapsed_seconds=None):
+        """Record an evaluated answer against the question's subtopic and level."""
+        self.analytics.record_turn(
+            self.ladder_tracker.current_subtopic,
+            self.ladder_tracker.current_level,
+            score,
+            feedback_type,
+            elapsed_seconds,
+        )
 
     def set_last_feedback_type(self, feedback_type):
         self._last_feedback_type = feedback_type
@@ -190,7 +285,7 @@ Topics:
 
                     Provide just the rephrased question"""
         try:
-            response = self.model.generate_content(prompt)
+            response = self.router.generate('rephrase', prompt, validate=_has_text)
             question = response.text.strip()
             original_label = last_question.split(':')[0] if ':' in last_question else 'L0'
             
@@ -1,25 +1,65 @@
 import os
-from dotenv import load_dotenv
-import google.generativeai as genai
 import re
+from answer_cache import default_answer_cache, normalize_question
+from reference_answer import ReferenceAnswer
+from model_router import ModelRouter
 
-# Load .env file
-load_dotenv()
+RESPONSE_TYPES = ("clarification_request", "zero_knowledge", "attempt")
+# Replies that are "zero_knowledge" without asking the model.
+ZERO_KNOWLEDGE_REPLIES = ("", "nah", "skip", "i don't know", "idk")
 
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    raise ValueError("No API key found.")
+def is_obvious_non_answer(user_answer):
+    return user_answer.strip().lower() in ZERO_KNOWLEDGE_REPLIES
 
-genai.configure(api_key=api_key)
+def _is_classification(response):
+    text = response.text.strip().lower()
+    return any(response_type in text for response_type in RESPONSE_TYPES)
+
+# Output tokens assumed per reference answer until one has been generated in
+# this session; after that the measured average is used.
+REFERENCE_ANSWER_TOKENS_PRIOR = int(os.getenv("REFERENCE_ANSWER_TOKENS_PRIOR", "200"))
+
+# Default for EnhancedEvaluator(answer_cache=...): the process-wide cache,
+# if enabled. Pass None to turn the cache off for one evaluator.
+_DEFAULT_CACHE = object()
+
+def _has_score(response):
+    return any(line.strip().lower().startswith('score:') for line in response.text.splitlines())
 
 class EnhancedEvaluator:
-    def __init__(self):
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
+    def __init__(self, answer_cache=_DEFAULT_CACHE, router=None):
+        # Picks the model tier per call type; share one router per session for accounting.
+        self.router = router if router is not None else ModelRouter()
+        # Grades of near-duplicate answers are reused when a cache is configured.
+        self.answer_cache = default_answer_cache() if answer_cache is _DEFAULT_CACHE else answer_cache
+        # Reference answers offered to the user still ungenerated, and how many were then generated.
+        self.reference_deferred = 0
+        self.reference_generated = 0
     
-    def evaluate_answer(self, user_answer, question, concept=None, difficulty="intermediate"):
-        """Enhanced evaluation with both feedback and correct answer always provided"""
+    def evaluate_answer(self, user_answer, question, concept=None, difficulty="intermediate", topic=None):
+        """
+        Enhanced evaluation with both feedback and correct answer always provided.
+
+        The correct answer is a ReferenceAnswer: when the grade did not include
+        one, it is only generated once something asks for it. `topic` is the
+        (subtopic, level) the question was asked for; it keys the answer cache.
+        """
         
         # First, use LLM to classify the response type
+        response_type = self.classify_response(user_answer, question)
+        
+        if response_type == "clarification_request":
+            return None, "Clarification requested", ReferenceAnswer(""), "clarification_request"
+        elif response_type == "zero_knowledge":
+            correct_answer = self.count_deferred(self.reference_answer(question, concept, score=0))
+            return 0, "No answer provided.", correct_answer, "zero_knowledge"
+        
+        result = self.grade_answer(user_answer, question, concept, topic)
+        self.count_deferred(result[2])
+        return result
+    
+    def classify_response(self, user_answer, question):
+        """Classify a reply as "clarification_request", "zero_knowledge" or "attempt"."""
         classification_prompt = f"""
 Analyze this student response to determine its type:
 
@@ -35,20 +75,43 @@ Respond with ONLY the classification type, nothing else.
 """
         
         try:
-            classification_response = self.model.generate_content(classification_prompt)
+            classification_response = self.router.generate('classify', classification_prompt,
+                                                           validate=_is_classification)
             response_type = classification_response.text.strip().lower()
             
             if "clarification_request" in response_type:
-                return None, "Clarification requested", "", "clarification_request"
+                return "clarification_request"
             elif "zero_knowledge" in response_type:
-                correct_answer = self._get_correct_answer(question, concept, score=0)
-                return 0, "No answer provided.", correct_answer, "zero_knowledge"
+                return "zero_knowledge"
         except Exception as e:
             # Fallback to basic empty check if LLM classification fails
-            user_lower = user_answer.strip().lower()
-            if user_lower in ["", "nah", "skip", "i don't know", "idk"]:
-                correct_answer = self._get_correct_answer(question, concept, score=0)
-                return 0, "No answer provided.", correct_answer, "zero_knowledge"
+            if is_obvious_non_answer(user_answer):
+                return "zero_knowledge"
+        return "attempt"
+    
+    def grade_answer(self, user_answer, question, concept=None, topic=None, store_if=None):
+        """
+        Grade a genuine attempt. Returns (score, feedback, correct_answer, feedback_type).
+
+        A fresh grade is stored in the answer cache unless `store_if` is given
+        and returns False, e.g. for a speculative grade of a reply that turned
+        out not to be an attempt.
+        """
+        answer_vector = question_vector = None
+        if self.answer_cache is not None:
+            try:
+                answer_vector = self.answer_cache.embed(user_answer)
+                question_vector = self.answer_cache.embed(normalize_question(question))
+                cached = self.answer_cache.lookup(question, user_answer, vector=answer_vector, topic=topic,
+                                                  question_vector=question_vector)
+                if cached is not None:
+                    score, feedback, answer_text, feedback_type = cached
+                    # A reworded question gets its own reference answer, never another question's.
+                    if answer_text is None:
+                        return score, feedback, self.reference_answer(question, concept, score), feedback_type
+                    return score, feedback, ReferenceAnswer(answer_text), feedback_type
+            except Exception as e:
+                print(f"Answer cache error: {e}")
         
         # --- THIS IS THE UPDATED PART ---
         # The persona is now a "friendly tutor" and the scoring is explicitly lenient.
@@ -78,11 +141,20 @@ Answer: <the correct answer, explained clearly for a learner>
 """
 
         try:
-            response = self.model.generate_content(prompt)
-            return self._parse_evaluation(response.text, user_answer, question, concept)
+            # A grade without a score line is retried on a stronger tier.
+            response = self.router.generate('grade', prompt, validate=_has_score)
+            result = self._parse_evaluation(response.text, user_answer, question, concept)
         except Exception as e:
-            correct_answer = self._get_correct_answer(question, concept, score=25)
+            correct_answer = self.reference_answer(question, concept, score=25)
             return 25, f"Evaluation error: {e}. Please try again.", correct_answer, "error"
+
+        # Only grades that came with their own answer are cached.
+        if answer_vector is not None and result[2].ready and (store_if is None or store_if()):
+            score, feedback, correct_answer, feedback_type = result
+            self.answer_cache.store(question, user_answer,
+                                    (score, feedback, correct_answer.get(), feedback_type),
+                                    vector=answer_vector, topic=topic, question_vector=question_vector)
+        return result
     
     def _parse_evaluation(self, response_text, user_answer, question, concept):
         """Parse the evaluation response to extract score, feedback, and answer"""
@@ -115,8 +187,10 @@ Answer: <the correct answer, explained clearly for a learner>
             elif current_section == "answer" and line and not line.lower().startswith(('score:', 'feedback:')):
                 answer += " " + line
         
-        if not answer.strip():
-            answer = self._get_correct_answer(question, concept, score)
+        if answer.strip():
+            correct_answer = ReferenceAnswer(answer.strip())
+        else:
+            correct_answer = self.reference_answer(question, concept, score)
         
         # Determine feedback type based on score
         if score >= 80:
@@ -128,10 +202,49 @@ Answer: <the correct answer, explained clearly for a learner>
         else:
             feedback_type = "needs_detailed_help"
         
-        return score, feedback.strip(), answer.strip(), feedback_type
+        return score, feedback.strip(), correct_answer, feedback_type
     
-    def _get_correct_answer(self, question, concept=None, score=50):
-        """Get a correct answer with detail level based on score"""
+    def reference_answer(self, question, concept=None, score=50):
+        """A handle that generates the correct answer only when it is first read."""
+        return ReferenceAnswer(generate=lambda: self._stream_correct_answer(question, concept, score),
+                               request={'question': question, 'concept': concept, 'score': score})
+
+    def count_deferred(self, reference):
+        """
+        Count `reference` as offered to the user before being generated.
+
+        Called where a handle is actually returned to the caller, so handles
+        built for a discarded speculative grade do not inflate the savings.
+        """
+        if not reference.ready:
+            self.reference_deferred += 1
+        return reference
+
+    def reference_stats(self):
+        """
+        Model calls and estimated output tokens saved by not generating unread answers.
+
+        Tokens per avoided call are the session's measured average once a
+        reference answer has been generated, and REFERENCE_ANSWER_TOKENS_PRIOR
+        before that; 'tokens_per_answer_source' says which.
+        """
+        avoided = self.reference_deferred - self.reference_generated
+        output_tokens = self.router.stats(by='call').get('reference_answer', {}).get('output_tokens', 0)
+        if self.reference_generated and output_tokens:
+            tokens_per_call, source = output_tokens / self.reference_generated, 'measured'
+        else:
+            tokens_per_call, source = REFERENCE_ANSWER_TOKENS_PRIOR, 'prior'
+        return {
+            'deferred': self.reference_deferred,
+            'generated': self.reference_generated,
+            'calls_avoided': avoided,
+            'output_tokens_used': output_tokens,
+            'output_tokens_avoided_estimate': round(avoided * tokens_per_call),
+            'tokens_per_answer_source': source,
+        }
+
+    def _stream_correct_answer(self, question, concept=None, score=50):
+        """Yield the correct answer in chunks, with detail level based on score"""
         if score > 80:
             detail_instruction = "Give a concise 1-2 line answer, like a quick confirmation."
         else:
@@ -147,8 +260,8 @@ Requirements:
 - Clear, relevant, and easy to digest
 """
         
+        self.reference_generated += 1
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
-        except:
-            return "Let me give you the key points you need to remember."
\ No newline at end of file
+            yield from self.router.stream('reference_answer', prompt)
+        except Exception:
+            yield "Let me give you the key points you need to remember."
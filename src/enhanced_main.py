@@ -1,6 +1,12 @@
 from enhanced_chatbot import EnhancedChatbot
 from enhanced_evaluate import EnhancedEvaluator
+from model_router import ModelRouter
+from turn_pipeline import TurnPipeline
+from chat_history import ChatHistory
+import gemini_client
+import keywordextractor
 import os
+import time
 
 def load_prompt(filename="prompts/enhanced_system_prompt.txt"):
     """Load the system prompt"""
@@ -41,19 +47,35 @@ def print_score_feedback(score, feedback, feedback_type):
     
     print_separator()
 
+def print_reference_answer(reference):
+    """Stream a reference answer to the terminal as it is generated"""
+    print("✅ CORRECT ANSWER: ", end="", flush=True)
+    for chunk in reference.stream():
+        print(chunk, end="", flush=True)
+    print("\n")
+
 def main():
     """Main interactive learning session"""
     print("🎓 Welcome to your AI Interview Preparation Assistant!\n")
     print("Type 'quit', 'exit', or 'stop' anytime to end the session.\n")
     
-    chatbot = EnhancedChatbot()
-    evaluator = EnhancedEvaluator()
-    chat_history = []
+    router = ModelRouter()
+    chatbot = EnhancedChatbot(router=router)
+    evaluator = EnhancedEvaluator(router=router)
+    pipeline = TurnPipeline(chatbot, evaluator)
+    show_timings = os.getenv("TURN_TIMINGS") == "1"
+    chat_history = ChatHistory()
+    # Load the Gemini client and keyword model while the user types their intro.
+    gemini_client.warm_up()
+    keywordextractor.warm_up()
     
     print("Let's start! Please introduce yourself and mention your technical background:")
     intro = input("👤 You: ").strip()
     
     if intro.lower() in ['quit', 'exit', 'stop']:
+        pipeline.close()
+        chatbot.close()
+        chat_history.close()
         print("👋 Goodbye! Come back anytime to continue learning.")
         return
     
@@ -63,18 +85,29 @@ def main():
     question_count = 0
     last_score = None
     last_concept = None
+    next_message = None
+    pending_reference = None
     
     print("🚀 Great! Let's begin your session...\n")
     
     while True:
         try:
-            bot_message = chatbot.get_next_question(chat_history, last_score, last_concept)
+            # The pipeline already generated the next question alongside grading.
+            bot_message = next_message or chatbot.get_next_question(chat_history, last_score, last_concept)
+            next_message = None
             question = bot_message['content']
             
             print(f"🤖 Interviewer: {question}")
             chat_history.append(bot_message)
             
+            asked_at = time.monotonic()
             user_reply = input("👤 You: ").strip()
+            # The previous reference answer is only generated if asked for.
+            while user_reply.lower() == 'answer' and pending_reference is not None:
+                print_reference_answer(pending_reference)
+                pending_reference = None
+                user_reply = input("👤 You: ").strip()
+            answer_seconds = time.monotonic() - asked_at
             
             if user_reply.lower() in ['quit', 'exit', 'stop']:
                 break
@@ -92,12 +125,14 @@ def main():
             should_evaluate = bot_message.get('evaluate', True) # Default to True
 
             if should_evaluate:
-                # Normal evaluation for technical questions
-                score, feedback, correct_answer, feedback_type = evaluator.evaluate_answer(
-                    user_reply, question,
-                )
-                
-                chatbot.set_last_feedback_type(feedback_type)
+                # Normal evaluation for technical questions; the pipeline also
+                # updates the chatbot and prepares the next question.
+                turn = pipeline.run(user_reply, question, chat_history, answer_seconds)
+                score, feedback = turn['score'], turn['feedback']
+                correct_answer, feedback_type = turn['correct_answer'], turn['feedback_type']
+                next_message = turn['next_message']
+                if show_timings:
+                    print(f"⏱️  {turn['timings']}")
 
                 if feedback_type == "clarification_request":
                     print(f"Okay, let me rephrase...")
@@ -111,11 +146,15 @@ def main():
 
                 print_score_feedback(score, feedback, feedback_type)
                 
-                if correct_answer and correct_answer.strip():
+                pending_reference = None
+                if correct_answer and correct_answer.ready:
                     print(f"✅ CORRECT ANSWER: {correct_answer}\n")
+                elif correct_answer:
+                    print("💡 Type 'answer' to see the correct answer.\n")
+                    pending_reference = correct_answer
                 
                 last_score = score
-                last_concept = chatbot.process_user_response(user_reply, question)
+                last_concept = turn['concept']
                 question_count += 1
             
             else:
@@ -134,8 +173,23 @@ def main():
             print(f"❌ An error occurred: {e}")
             print("Let's continue with the next question.\n")
     
+    pipeline.close()
+    chatbot.close()
+    chat_history.close()
     print("\n🎯 Session Complete!")
     print(f"📈 Total questions answered: {question_count}")
+    reference = evaluator.reference_stats()
+    if reference['deferred']:
+        print(f"🧮 Reference answers skipped: {reference['calls_avoided']} of {reference['deferred']} "
+              f"(est. ~{reference['output_tokens_avoided_estimate']} output tokens, "
+              f"{reference['tokens_per_answer_source']} tokens/answer)")
+    stats = chatbot.analytics.summary()
+    if stats['scored_answers']:
+        print(f"📊 Average score: {stats['mean_score']} (±{stats['score_std']})")
+        print(f"⏱️  Average time per answer: {stats['mean_answer_seconds']}s")
+    for tier, row in router.stats().items():
+        print(f"🤖 {tier}: {row['calls']} calls, {row['escalations']} escalated in, "
+              f"{row['mean_latency_ms']} ms avg, ${row['cost_usd']:.4f}")
     print("\n👋 Great work! Come back anytime to continue learning!")
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+import os
+import threading
+
+# google.generativeai pulls in grpc and protobuf and takes a noticeable part
+# of a second to import, so it is imported and configured here once, on
+# first use, instead of at module import in every file that calls Gemini.
+_genai = None
+_lock = threading.Lock()
+
+
+def load_api_key():
+    """Read GEMINI_API_KEY (from the environment or .env) or raise."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("No API key found.")
+    return api_key
+
+
+def get_genai():
+    """The configured google.generativeai module."""
+    global _genai
+    if _genai is None:
+        with _lock:
+            if _genai is None:
+                api_key = load_api_key()
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                _genai = genai
+    return _genai
+
+
+def warm_up():
+    """Import and configure the client on a background thread."""
+    def load():
+        try:
+            get_genai()
+        except Exception as e:
+            print(f"Gemini client warm-up error: {e}")
+
+    thread = threading.Thread(target=load, name="gemini-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,85 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from keywordextractor import extract_keywords_batch
+
+
+class BackgroundKeywordExtractor:
+    """
+    Runs keyword extraction off the request path.
+
+    Extracted topics only feed future topic picks, so the turn that submitted
+    the text never waits for them. Texts that arrive while an extraction is
+    running are queued and handed to `extract_keywords_batch` together, so
+    the spaCy backend gets one `nlp.pipe` call per batch. At most
+    `max_pending` texts are queued or being extracted; when that bound is
+    hit, `submit` waits up to `submit_timeout` seconds for room and drops the
+    new text if none frees up. Results wait in a buffer until `collect`.
+    """
+
+    def __init__(self, max_pending=4, max_workers=1, submit_timeout=2.0, backend=None):
+        self.max_pending = max_pending
+        self.submit_timeout = submit_timeout
+        self.backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="keyword-extractor")
+        self._queued = deque()
+        self._in_flight = 0
+        self._finished = []
+        self._changed = threading.Condition()
+        self.dropped = 0
+
+    def submit(self, text):
+        """Queue `text` for extraction. Returns False if it was dropped."""
+        with self._changed:
+            if not self._changed.wait_for(lambda: self._pending() < self.max_pending,
+                                          timeout=self.submit_timeout):
+                self.dropped += 1
+                return False
+            self._queued.append(text)
+        self._executor.submit(self._run_batch)
+        return True
+
+    def _run_batch(self):
+        with self._changed:
+            texts = list(self._queued)
+            self._queued.clear()
+            self._in_flight += len(texts)
+        if not texts:
+            return  # an earlier batch already took this text
+        try:
+            results = extract_keywords_batch(texts, backend=self.backend)
+        except Exception as e:
+            print(f"Background keyword extraction error: {e}")
+            results = [[] for _ in texts]
+        with self._changed:
+            self._finished.extend(results)
+            self._in_flight -= len(texts)
+            self._changed.notify_all()
+
+    def _pending(self):
+        return len(self._queued) + self._in_flight
+
+    def collect(self):
+        """Return keyword lists of finished extractions, oldest first, without blocking."""
+        with self._changed:
+            results, self._finished = self._finished, []
+        return results
+
+    def flush(self, timeout=None):
+        """Wait for every pending extraction (up to `timeout` seconds) and return what finished."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._pending() == 0, timeout=timeout)
+        return self.collect()
+
+    def pending_count(self):
+        """Texts queued or being extracted; never more than `max_pending`."""
+        with self._changed:
+            return self._pending()
+
+    def shutdown(self, timeout=None):
+        """Drain outstanding work and stop the executor. Returns the drained results."""
+        results = self.flush(timeout)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        return results
@@ -1,12 +1,147 @@
-from keybert import KeyBERT #type: ignore
-# Initialize the KeyBERT model. 
-# This will be done only once when the module is first imported.
-kw_model = KeyBERT()
+import os
+import threading
 
-def extract_keywords(text):
+# Which extractor `extract_keywords` uses when no backend is passed explicitly.
+# "keybert" is the original transformer + MMR path, "spacy" is the fast
+# noun-chunk/entity path built on the en_core_web_md vectors.
+KEYWORD_BACKEND = os.getenv("KEYWORD_BACKEND", "keybert").strip().lower()
+
+# Sentence-transformer behind KeyBERT and how it runs on CPU:
+#   "fp32" - the stock PyTorch model (reference quality)
+#   "int8" - PyTorch dynamic int8 quantization of the Linear layers
+#   "onnx" - ONNX Runtime via sentence-transformers' onnx backend
+# KEYBERT_NUM_THREADS caps intra-op threads for either runtime (0 = library default).
+EMBEDDING_MODEL = os.getenv("KEYBERT_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_BACKEND = os.getenv("KEYBERT_EMBEDDING_BACKEND", "fp32").strip().lower()
+KEYBERT_NUM_THREADS = int(os.getenv("KEYBERT_NUM_THREADS", "0"))
+
+# Reject typos here: inside extract_keywords they would only show up as an
+# error print and empty keyword lists on every call.
+if KEYWORD_BACKEND not in ("keybert", "spacy"):
+    raise ValueError(f"Unknown KEYWORD_BACKEND: {KEYWORD_BACKEND!r} (expected 'keybert' or 'spacy')")
+if EMBEDDING_BACKEND not in ("fp32", "int8", "onnx"):
+    raise ValueError(f"Unknown KEYBERT_EMBEDDING_BACKEND: {EMBEDDING_BACKEND!r} "
+                     "(expected 'fp32', 'int8' or 'onnx')")
+
+# spaCy pipeline components the fast path never reads. en_core_web_md ships
+# tok2vec, tagger, parser, attribute_ruler, lemmatizer and ner (senter is
+# already disabled by default). Noun chunks need the tagger, attribute_ruler
+# and parser, entities need ner, so only the lemmatizer can go.
+SPACY_DISABLED_COMPONENTS = ["lemmatizer"]
+
+# The models are loaded only once, on first use of their backend (or by
+# warm_up). KeyBERT, torch and spaCy are imported at that point too, so
+# importing this module stays cheap.
+embedding_model = None
+kw_model = None
+nlp = None
+_load_lock = threading.RLock()
+
+
+def get_embedding_model():
+    """
+    Load the sentence-transformer used by KeyBERT, honouring EMBEDDING_BACKEND.
+    """
+    global embedding_model
+    if embedding_model is not None:
+        return embedding_model
+    with _load_lock:
+        if embedding_model is None:
+            embedding_model = _load_embedding_model()
+    return embedding_model
+
+
+def _load_embedding_model():
+    from sentence_transformers import SentenceTransformer #type: ignore
+
+    if EMBEDDING_BACKEND == "onnx":
+        import onnxruntime as ort #type: ignore
+        session_options = ort.SessionOptions()
+        if KEYBERT_NUM_THREADS > 0:
+            session_options.intra_op_num_threads = KEYBERT_NUM_THREADS
+            session_options.inter_op_num_threads = 1
+        return SentenceTransformer(
+            EMBEDDING_MODEL,
+            device="cpu",
+            backend="onnx",
+            model_kwargs={"provider": "CPUExecutionProvider", "session_options": session_options},
+        )
+
+    import torch #type: ignore
+    if KEYBERT_NUM_THREADS > 0:
+        torch.set_num_threads(KEYBERT_NUM_THREADS)
+
+    model = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+    if EMBEDDING_BACKEND == "int8":
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+    return model
+
+
+def _get_kw_model():
+    global kw_model
+    if kw_model is None:
+        with _load_lock:
+            if kw_model is None:
+                from keybert import KeyBERT #type: ignore
+                kw_model = KeyBERT(model=get_embedding_model())
+    return kw_model
+
+
+def _get_nlp():
+    global nlp
+    if nlp is None:
+        with _load_lock:
+            if nlp is None:
+                import spacy #type: ignore
+                nlp = spacy.load("en_core_web_md", disable=SPACY_DISABLED_COMPONENTS)
+    return nlp
+
+
+def embed_phrases(texts, backend=None):
     """
-    Extracts the most relevant technical keywords from a given text using KeyBERT.
+    Unit-norm vectors for short phrases, from the model `backend` already uses:
+    the en_core_web_md vectors for "spacy", the sentence-transformer otherwise.
     """
+    backend = (backend or KEYWORD_BACKEND).lower()
+    if backend == "spacy":
+        import numpy as np
+        return np.array([doc.vector / doc.vector_norm if doc.vector_norm else doc.vector
+                         for doc in _get_nlp().pipe(texts)], dtype=np.float32)
+    return get_embedding_model().encode(texts, normalize_embeddings=True)
+
+
+def warm_up(backend=None):
+    """
+    Load the model for `backend` on a background thread, e.g. while the user
+    is still typing their introduction. Extraction calls that arrive first
+    wait for the same load instead of starting a second one.
+    """
+    backend = (backend or KEYWORD_BACKEND).lower()
+
+    def load():
+        try:
+            _get_nlp() if backend == "spacy" else _get_kw_model()
+        except Exception as e:
+            print(f"Keyword model warm-up error: {e}")
+
+    thread = threading.Thread(target=load, name="keyword-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def extract_keywords(text, backend=None):
+    """
+    Extracts the most relevant technical keywords from a given text.
+
+    `backend` selects "keybert" or "spacy"; it defaults to KEYWORD_BACKEND.
+    """
+    backend = (backend or KEYWORD_BACKEND).lower()
+    if backend == "spacy":
+        return extract_keywords_batch([text], backend="spacy")[0]
+    if backend != "keybert":
+        raise ValueError(f"Unknown keyword backend: {backend}")
+
     try:
         # We use the model to extract keywords.
         # keyphrase_ngram_range: Looks for single words up to 3-word phrases.
@@ -14,23 +149,82 @@ def extract_keywords(text):
         # use_mmr=True, diversity=0.7: This is important! It ensures the keywords
         # are diverse and not just variations of the same concept.
         # top_n=3: Extracts a maximum of 3 keywords, as requested.
-        keywords = kw_model.extract_keywords(text, 
-                                             keyphrase_ngram_range=(1, 3), 
-                                             stop_words='english', 
-                                             use_mmr=True, 
+        keywords = _get_kw_model().extract_keywords(text,
+                                             keyphrase_ngram_range=(1, 3),
+                                             stop_words='english',
+                                             use_mmr=True,
                                              diversity=0.7,
                                              top_n=3)
-        
+
         # The model returns keywords with a relevance score. We only need the words.
         # We also filter out any keywords with very low relevance (score < 0.3).
         # This helps to further filter out generic or irrelevant words.
-        
+
         # keywords look like [('machine learning', 0.56), ('supervised learning', 0.45)]
-        
+
         keyword_list = [kw for kw, score in keywords if score > 0.3]
-        
+
         return keyword_list
-        
+
     except Exception as e:
         print(f"KeyBERT error: {e}")
-        return []
\ No newline at end of file
+        return []
+
+
+def extract_keywords_batch(texts, backend=None, top_n=3, batch_size=32):
+    """
+    Extracts keywords for several texts at once. Returns one list per text.
+
+    The spaCy backend runs every text through a single `nlp.pipe` call, which
+    is where most of its speed advantage over per-call KeyBERT comes from.
+    """
+    backend = (backend or KEYWORD_BACKEND).lower()
+    if backend == "keybert":
+        return [extract_keywords(text, backend="keybert") for text in texts]
+    if backend != "spacy":
+        raise ValueError(f"Unknown keyword backend: {backend}")
+
+    try:
+        docs = _get_nlp().pipe(texts, batch_size=batch_size)
+        return [_rank_spacy_candidates(doc, top_n) for doc in docs]
+    except Exception as e:
+        print(f"spaCy keyword error: {e}")
+        return [[] for _ in texts]
+
+
+def _rank_spacy_candidates(doc, top_n=3, min_similarity=0.3):
+    """
+    Rank noun chunks and named entities by vector similarity to the whole text.
+
+    Mirrors the KeyBERT settings: phrases of at most 3 words, no stop words,
+    a 0.3 relevance floor, and no candidate that overlaps one already picked.
+    """
+    if not doc.has_vector or doc.vector_norm == 0:
+        return []
+
+    candidates = {}
+    for span in list(doc.ents) + list(doc.noun_chunks):
+        # Drop leading determiners/pronouns ("the", "my") and stop words.
+        tokens = [t for t in span if not t.is_stop and not t.is_punct and not t.like_num]
+        if not tokens or len(tokens) > 3:
+            continue
+        phrase = " ".join(t.text.lower() for t in tokens)
+        if phrase in candidates:
+            continue
+        if not any(t.has_vector for t in tokens):
+            continue
+        candidate = doc[tokens[0].i:tokens[-1].i + 1]
+        candidates[phrase] = candidate.similarity(doc)
+
+    ranked = sorted(candidates.items(), key=lambda item: item[1], reverse=True)
+    keyword_list = []
+    for phrase, score in ranked:
+        if score <= min_similarity:
+            break
+        words = set(phrase.split())
+        if any(words & set(kept.split()) for kept in keyword_list):
+            continue
+        keyword_list.append(phrase)
+        if len(keyword_list) == top_n:
+            break
+    return keyword_list
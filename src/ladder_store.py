@@ -0,0 +1,237 @@
+import sys
+import threading
+
+import numpy as np
+
+NO_SUBTOPIC = -1
+
+
+class LadderStore:
+    """
+    Ladder state for many sessions in flat arrays.
+
+    Each session owns one row: an int8 level and an int32 id into a table of
+    interned subtopic names. Subtopic ids are counted per row using them and
+    freed for reuse when the last such row moves on, so free-text subtopics
+    do not accumulate over the life of the process. Trackers opened with the same session id share
+    its row, which is freed for reuse once every one of them released it. Batch
+    transitions take a list of session ids and update every row in one
+    vectorized call; a session listed twice in the same call moves once.
+    """
+
+    __slots__ = ('min_level', 'max_level', '_levels', '_subtopics', '_row_refs', '_rows',
+                 '_level_cells', '_subtopic_cells',
+                 '_free_rows', '_next_row', '_subtopic_ids', '_subtopic_names',
+                 '_subtopic_refs', '_free_subtopic_ids', '_lock')
+
+    def __init__(self, capacity=1024, min_level=-3, max_level=3):
+        self.min_level = min_level
+        self.max_level = max_level
+        self._levels = np.zeros(capacity, dtype=np.int8)
+        self._subtopics = np.full(capacity, NO_SUBTOPIC, dtype=np.int32)
+        self._row_refs = np.zeros(capacity, dtype=np.int32)  # trackers holding each row
+        self._set_cells()
+        self._rows = {}           # session id -> row index
+        self._free_rows = []
+        self._next_row = 0
+        self._subtopic_ids = {}   # subtopic name -> id
+        self._subtopic_names = []  # id -> name, None once freed
+        self._subtopic_refs = []   # id -> rows using it
+        self._free_subtopic_ids = []
+        self._lock = threading.Lock()
+
+    # --- Session rows ---
+
+    def add_session(self, session_id):
+        """
+        Return the row of `session_id`, allocating one at L0 with no subtopic
+        if the session is new. Every call must be matched by a `release_session`.
+        """
+        with self._lock:
+            row = self._rows.get(session_id)
+            if row is not None:
+                self._row_refs[row] += 1
+                return row
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                row = self._next_row
+                self._next_row += 1
+                if row >= len(self._levels):
+                    self._grow(2 * len(self._levels))
+            self._levels[row] = 0
+            self._subtopics[row] = NO_SUBTOPIC
+            self._row_refs[row] = 1
+            self._rows[session_id] = row
+            return row
+
+    def release_session(self, session_id):
+        """Drop one reference to the row of `session_id`; the last one frees it for reuse."""
+        with self._lock:
+            row = self._rows.get(session_id)
+            if row is None:
+                return
+            self._row_refs[row] -= 1
+            if self._row_refs[row] == 0:
+                del self._rows[session_id]
+                self._release_subtopic(self._subtopics.item(row))
+                self._subtopics[row] = NO_SUBTOPIC
+                self._free_rows.append(row)
+
+    def row(self, session_id):
+        return self._rows[session_id]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, session_id):
+        return session_id in self._rows
+
+    def _grow(self, capacity):
+        levels = np.zeros(capacity, dtype=np.int8)
+        subtopics = np.full(capacity, NO_SUBTOPIC, dtype=np.int32)
+        row_refs = np.zeros(capacity, dtype=np.int32)
+        levels[:len(self._levels)] = self._levels
+        subtopics[:len(self._subtopics)] = self._subtopics
+        row_refs[:len(self._row_refs)] = self._row_refs
+        self._levels = levels
+        self._subtopics = subtopics
+        self._row_refs = row_refs
+        self._set_cells()
+
+    def _set_cells(self):
+        # Memoryviews over the arrays read and write one row as a plain int,
+        # several times faster than indexing the numpy arrays with a scalar.
+        self._level_cells = memoryview(self._levels)
+        self._subtopic_cells = memoryview(self._subtopics)
+
+    # --- Single-row access (used by LadderTracker) ---
+    # Scalar reads and writes: no index arrays are built for one session.
+
+    def get_level(self, row):
+        return self._level_cells[row]
+
+    def set_level(self, row, level):
+        with self._lock:
+            self._level_cells[row] = level
+
+    def get_subtopic(self, row):
+        subtopic_id = self._subtopic_cells[row]
+        return None if subtopic_id == NO_SUBTOPIC else self._subtopic_names[subtopic_id]
+
+    def set_subtopic(self, row, subtopic):
+        with self._lock:
+            subtopic_id = NO_SUBTOPIC if not subtopic else self._intern(subtopic)
+            self._release_subtopic(self._subtopic_cells[row])
+            self._subtopic_cells[row] = subtopic_id
+
+    def go_up_row(self, row):
+        """Move one row up a level, capped at max_level. Returns whether it moved."""
+        with self._lock:
+            level = self._level_cells[row]
+            if level >= self.max_level:
+                return False
+            self._level_cells[row] = level + 1
+            return True
+
+    def go_down_row(self, row):
+        """Move one row down a level, floored at min_level. Returns whether it moved."""
+        with self._lock:
+            level = self._level_cells[row]
+            if level <= self.min_level:
+                return False
+            self._level_cells[row] = level - 1
+            return True
+
+    def reset_row(self, row):
+        """Put one row back at L0 with no subtopic."""
+        with self._lock:
+            self._release_subtopic(self._subtopic_cells[row])
+            self._level_cells[row] = 0
+            self._subtopic_cells[row] = NO_SUBTOPIC
+
+    def _intern(self, subtopic):
+        """Id of `subtopic`, counting one more row that uses it."""
+        subtopic_id = self._subtopic_ids.get(subtopic)
+        if subtopic_id is None:
+            if self._free_subtopic_ids:
+                subtopic_id = self._free_subtopic_ids.pop()
+                self._subtopic_names[subtopic_id] = subtopic
+            else:
+                subtopic_id = len(self._subtopic_names)
+                self._subtopic_names.append(subtopic)
+                self._subtopic_refs.append(0)
+            self._subtopic_ids[subtopic] = subtopic_id
+        self._subtopic_refs[subtopic_id] += 1
+        return subtopic_id
+
+    def _release_subtopic(self, subtopic_id, rows=1):
+        """Count `rows` fewer rows using `subtopic_id`; free the id when none are left."""
+        if subtopic_id == NO_SUBTOPIC:
+            return
+        self._subtopic_refs[subtopic_id] -= rows
+        if self._subtopic_refs[subtopic_id] == 0:
+            del self._subtopic_ids[self._subtopic_names[subtopic_id]]
+            self._subtopic_names[subtopic_id] = None
+            self._free_subtopic_ids.append(subtopic_id)
+
+    # --- Batch transitions ---
+
+    def _rows_for(self, session_ids):
+        return np.fromiter((self._rows[s] for s in session_ids), dtype=np.int64)
+
+    def go_up(self, session_ids):
+        """Move every session up one level, capped at max_level. Returns a bool array of who moved."""
+        with self._lock:
+            rows = self._rows_for(session_ids)
+            moved = self._levels[rows] < self.max_level
+            self._levels[rows[moved]] += 1
+            return moved
+
+    def go_down(self, session_ids):
+        """Move every session down one level, floored at min_level. Returns a bool array of who moved."""
+        with self._lock:
+            rows = self._rows_for(session_ids)
+            moved = self._levels[rows] > self.min_level
+            self._levels[rows[moved]] -= 1
+            return moved
+
+    def reset(self, session_ids):
+        """Put every session back at L0 with no subtopic."""
+        with self._lock:
+            rows = np.unique(self._rows_for(session_ids))
+            subtopic_ids, counts = np.unique(self._subtopics[rows], return_counts=True)
+            for subtopic_id, count in zip(subtopic_ids.tolist(), counts.tolist()):
+                self._release_subtopic(subtopic_id, count)
+            self._levels[rows] = 0
+            self._subtopics[rows] = NO_SUBTOPIC
+
+    def levels(self, session_ids):
+        """Current levels of the given sessions as an int8 array."""
+        return self._levels[self._rows_for(session_ids)]
+
+    # --- Accounting ---
+
+    def memory_usage(self):
+        """Approximate bytes held by the store, and per live session."""
+        array_bytes = self._levels.nbytes + self._subtopics.nbytes + self._row_refs.nbytes
+        index_bytes = sys.getsizeof(self._rows) + sum(sys.getsizeof(s) for s in self._rows)
+        subtopic_bytes = (sys.getsizeof(self._subtopic_ids) + sys.getsizeof(self._subtopic_names)
+                          + sys.getsizeof(self._subtopic_refs)
+                          + sum(sys.getsizeof(name) for name in self._subtopic_ids))
+        total = array_bytes + index_bytes + subtopic_bytes
+        sessions = len(self._rows)
+        return {
+            'sessions': sessions,
+            'subtopics': len(self._subtopic_ids),
+            'capacity': len(self._levels),
+            'array_bytes': array_bytes,
+            'index_bytes': index_bytes,
+            'subtopic_bytes': subtopic_bytes,
+            'total_bytes': total,
+            'bytes_per_session': total / sessions if sessions else 0.0,
+        }
+
+
+# Shared by every LadderTracker that is not given its own store.
+default_store = LadderStore()
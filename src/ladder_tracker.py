@@ -1,29 +1,67 @@
+import uuid
+
+from ladder_store import default_store
+
+
 class LadderTracker:
-    def __init__(self):
-        self.current_subtopic = None
-        self.current_level = 0  # L0 is the baseline
-        self.min_level = -3     # Easiest remedial level
-        self.max_level = 3      # Hardest challenge level
-        
+    """
+    One session's view over a LadderStore row.
+
+    The level and subtopic live in the store's arrays; this object only keeps
+    the row index, so thousands of sessions can share one compact store.
+    """
+
+    __slots__ = ('store', 'session_id', '_row')
+
+    def __init__(self, store=None, session_id=None):
+        self.store = store if store is not None else default_store
+        self.session_id = session_id or uuid.uuid4().hex
+        self._row = self.store.add_session(self.session_id)
+
+    def __del__(self):
+        try:
+            self.store.release_session(self.session_id)
+        except Exception:
+            pass
+
+    @property
+    def min_level(self):
+        """Easiest remedial level"""
+        return self.store.min_level
+
+    @property
+    def max_level(self):
+        """Hardest challenge level"""
+        return self.store.max_level
+
+    @property
+    def current_level(self):
+        return self.store.get_level(self._row)
+
+    @current_level.setter
+    def current_level(self, level):
+        self.store.set_level(self._row, level)
+
+    @property
+    def current_subtopic(self):
+        return self.store.get_subtopic(self._row)
+
+    @current_subtopic.setter
+    def current_subtopic(self, subtopic):
+        self.store.set_subtopic(self._row, subtopic)
+
     def go_up_ladder(self):
         """Move up one level in the ladder, maxing out at L+3."""
-        if self.current_level < self.max_level:
-            self.current_level += 1
-            return True
-        return False
-    
+        return self.store.go_up_row(self._row)
+
     def go_down_ladder(self):
         """Move down one level in the ladder, bottoming out at L-3."""
-        if self.current_level > self.min_level:
-            self.current_level -= 1
-            return True
-        return False
-    
+        return self.store.go_down_row(self._row)
+
     def reset_for_new_subtopic(self):
         """Reset tracker for a new subtopic, starting at L0."""
-        self.current_subtopic = None
-        self.current_level = 0
-    
+        self.store.reset_row(self._row)
+
     def get_status(self):
         """Get current ladder status."""
         return {
@@ -38,6 +76,6 @@ class LadderTracker:
         """
         if reset:
             self.reset_for_new_subtopic()
-        
+
         if not self.current_subtopic:
-            self.current_subtopic = subtopic
\ No newline at end of file
+            self.current_subtopic = subtopic
@@ -0,0 +1,196 @@
+from collections import defaultdict
+import json
+import os
+import threading
+import time
+
+from gemini_client import get_genai, load_api_key
+
+# Model behind each tier, cheapest first. Tiers can point at the same model.
+MODEL_TIERS = {
+    'lite': os.getenv("MODEL_TIER_LITE", "gemini-2.5-flash-lite"),
+    'standard': os.getenv("MODEL_TIER_STANDARD", "gemini-2.5-flash-lite"),
+    'strong': os.getenv("MODEL_TIER_STRONG", "gemini-2.5-flash"),
+}
+TIER_ORDER = ['lite', 'standard', 'strong']
+
+# Tier per call type, optionally per ladder level as "call_type:level".
+# MODEL_ROUTES (JSON) overrides or extends these, e.g. '{"question:3": "strong"}'.
+DEFAULT_ROUTES = {
+    'classify': 'lite',
+    'seed_topics': 'lite',
+    'rephrase': 'lite',
+    'question': 'standard',
+    'question:0': 'lite',
+    'question:-1': 'lite',
+    'question:-2': 'lite',
+    'question:-3': 'lite',
+    'grade': 'standard',
+    'reference_answer': 'standard',
+}
+
+# Transport errors (rate limits, timeouts) are retried on the same tier this
+# many times, with exponential backoff, before the call fails.
+MODEL_RETRIES = int(os.getenv("MODEL_RETRIES", "1"))
+
+# USD per million (input, output) tokens; MODEL_PRICES (JSON) overrides.
+DEFAULT_PRICES = {
+    'gemini-2.5-flash-lite': [0.10, 0.40],
+    'gemini-2.5-flash': [0.30, 2.50],
+}
+
+
+def _json_env(name, default):
+    merged = dict(default)
+    raw = os.getenv(name)
+    if raw:
+        merged.update(json.loads(raw))
+    return merged
+
+
+class ModelRouter:
+    """
+    Sends each model call to the cheapest tier configured for its call type.
+
+    `generate` escalates to the next tier up only when its `validate`
+    callback rejects the response (e.g. a grade without a score), so cheap
+    tiers can serve the common case without risking the turn. Tiers backed by
+    a model already tried are skipped. A call that raises (rate limit,
+    network) is retried on the same tier and then re-raised: a stronger
+    model would not fix it and only costs more. Every
+    call is accounted per tier and per call type: calls, escalations,
+    failures, latency, tokens and estimated cost.
+
+    `models` maps tier names to ready model objects with a Gemini-style
+    `generate_content`, which is how a local model can be plugged in as a tier.
+    """
+
+    def __init__(self, tiers=None, routes=None, prices=None, models=None,
+                 retries=MODEL_RETRIES, retry_delay=0.5):
+        self.tiers = dict(tiers or MODEL_TIERS)
+        self.routes = routes or _json_env("MODEL_ROUTES", DEFAULT_ROUTES)
+        self.prices = prices or _json_env("MODEL_PRICES", DEFAULT_PRICES)
+        self._models = dict(models or {})
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._tier_stats = defaultdict(self._empty_stats)
+        self._call_stats = defaultdict(self._empty_stats)
+        if any(tier not in self._models for tier in self.tiers):
+            load_api_key()  # fail at startup, not on the first question
+
+    @staticmethod
+    def _empty_stats():
+        return {'calls': 0, 'failures': 0, 'escalations': 0, 'seconds': 0.0,
+                'input_tokens': 0, 'output_tokens': 0, 'cost_usd': 0.0}
+
+    def tier_for(self, call_type, level=None):
+        if level is not None and f"{call_type}:{level}" in self.routes:
+            return self.routes[f"{call_type}:{level}"]
+        return self.routes.get(call_type, 'standard')
+
+    def model(self, tier):
+        model = self._models.get(tier)
+        if model is None:
+            model = self._models[tier] = get_genai().GenerativeModel(self.tiers[tier])
+        return model
+
+    def generate(self, call_type, prompt, level=None, validate=None, **kwargs):
+        """
+        Run `prompt` on the routed tier and return the response.
+
+        When `validate` rejects a response, the prompt is retried on each
+        stronger tier with a different model; the last response is returned
+        if none passes. Exceptions are retried on the same tier and then
+        raised.
+        """
+        response = None
+        for attempt, tier in enumerate(self._escalation_path(self.tier_for(call_type, level))):
+            if attempt:
+                self._count(tier, call_type, 'escalations')
+            response = self._call(tier, call_type, prompt, **kwargs)
+            if validate is None or self._passes(validate, response):
+                return response
+            self._count(tier, call_type, 'failures')
+        return response
+
+    def _escalation_path(self, tier):
+        """`tier` and the stronger tiers after it, skipping repeats of the same model."""
+        start = TIER_ORDER.index(tier) if tier in TIER_ORDER else len(TIER_ORDER)
+        path, seen = [], set()
+        for candidate in [tier] + TIER_ORDER[start + 1:]:
+            model_name = self.tiers.get(candidate, candidate)
+            if model_name not in seen:
+                seen.add(model_name)
+                path.append(candidate)
+        return path
+
+    def _call(self, tier, call_type, prompt, **kwargs):
+        for attempt in range(self.retries + 1):
+            began = time.perf_counter()
+            try:
+                response = self.model(tier).generate_content(prompt, **kwargs)
+            except Exception:
+                self._count(tier, call_type, 'failures')
+                self._record(tier, call_type, None, time.perf_counter() - began)
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.retry_delay * 2 ** attempt)
+                continue
+            self._record(tier, call_type, response, time.perf_counter() - began)
+            return response
+
+    @staticmethod
+    def _passes(validate, response):
+        try:
+            return bool(validate(response))
+        except Exception:
+            return False
+
+    def stream(self, call_type, prompt, level=None, **kwargs):
+        """Yield response text chunks from the routed tier; no escalation."""
+        tier = self.tier_for(call_type, level)
+        began = time.perf_counter()
+        response = None
+        try:
+            response = self.model(tier).generate_content(prompt, stream=True, **kwargs)
+            for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        except Exception:
+            self._count(tier, call_type, 'failures')
+            raise
+        finally:
+            self._record(tier, call_type, response, time.perf_counter() - began)
+
+    def _record(self, tier, call_type, response, seconds):
+        usage = getattr(response, 'usage_metadata', None) if response is not None else None
+        input_tokens = (getattr(usage, 'prompt_token_count', 0) or 0) if usage else 0
+        output_tokens = (getattr(usage, 'candidates_token_count', 0) or 0) if usage else 0
+        input_price, output_price = self.prices.get(self.tiers.get(tier, tier), (0.0, 0.0))
+        cost = (input_tokens * input_price + output_tokens * output_price) / 1e6
+        with self._lock:
+            for stats in (self._tier_stats[tier], self._call_stats[call_type]):
+                stats['calls'] += 1
+                stats['seconds'] += seconds
+                stats['input_tokens'] += input_tokens
+                stats['output_tokens'] += output_tokens
+                stats['cost_usd'] += cost
+
+    def _count(self, tier, call_type, field):
+        with self._lock:
+            self._tier_stats[tier][field] += 1
+            self._call_stats[call_type][field] += 1
+
+    def stats(self, by='tier'):
+        """Accounting per tier (by='tier') or per call type (by='call')."""
+        with self._lock:
+            source = self._tier_stats if by == 'tier' else self._call_stats
+            report = {}
+            for name, stats in source.items():
+                row = dict(stats)
+                row['mean_latency_ms'] = round(1000 * row['seconds'] / row['calls'], 1) if row['calls'] else 0.0
+                row['seconds'] = round(row['seconds'], 3)
+                row['cost_usd'] = round(row['cost_usd'], 6)
+                report[name] = row
+            return report
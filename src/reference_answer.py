@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+
+# "lazy" generates a reference answer only when someone asks for it;
+# "prefetch" also generates it in the background once the turn is done.
+REFERENCE_ANSWER_MODE = os.getenv("REFERENCE_ANSWER_MODE", "lazy").strip().lower()
+
+# One worker, so prefetches queue up behind each other instead of competing
+# with the calls a turn is actually waiting on.
+_prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reference-prefetch")
+
+
+class ReferenceAnswer:
+    """
+    A reference answer that may not have been generated yet.
+
+    Built either from text that is already known (e.g. the `Answer:` section of
+    a grade) or from a `generate` callable that yields text chunks. Nothing is
+    generated until `get`, `stream` or `prefetch` is called, and it is
+    generated at most once: if a reader stops a `stream` early, the rest of
+    the generation is finished in the background rather than thrown away.
+    `request` optionally records what to generate (JSON-serializable), so a
+    handle saved before it was generated can be rebuilt in another process.
+    """
+
+    def __init__(self, text=None, generate=None, request=None):
+        self._text = text
+        self._generate = generate
+        self.request = request
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._text is not None
+
+    def __bool__(self):
+        if self._text is not None:
+            return bool(self._text.strip())
+        return self._generate is not None
+
+    def __str__(self):
+        return self.get()
+
+    def get(self):
+        """Return the full answer, generating it now if needed."""
+        for _ in self.stream():
+            pass
+        return self._text or ""
+
+    def stream(self):
+        """Yield the answer in chunks as the model produces them."""
+        if self._text is not None:
+            yield self._text
+            return
+        if not self._lock.acquire(blocking=False):
+            # A prefetch is already generating it; wait for that instead.
+            with self._lock:
+                pass
+            yield self._text or ""
+            return
+        handed_off = False
+        try:
+            if self._text is not None:
+                yield self._text
+                return
+            chunks = []
+            source = self._generate()
+            try:
+                for chunk in source:
+                    chunks.append(chunk)
+                    yield chunk
+            except GeneratorExit:
+                # The reader went away mid-answer (e.g. a Streamlit rerun). The
+                # call is already paid for, so finish it; the lock goes with it.
+                _prefetch_executor.submit(self._finish, source, chunks)
+                handed_off = True
+                return
+            self._text = "".join(chunks).strip()
+        finally:
+            if not handed_off:
+                self._lock.release()
+
+    def _finish(self, source, chunks):
+        try:
+            chunks.extend(source)
+        except Exception as e:
+            print(f"Reference answer error: {e}")
+        finally:
+            self._text = "".join(chunks).strip()
+            self._lock.release()
+
+    def prefetch(self):
+        """Generate in the background so a later `get` returns immediately."""
+        if self._text is None:
+            _prefetch_executor.submit(self.get)
@@ -0,0 +1,166 @@
+"""
+Serve the app from several Streamlit worker processes behind a sticky router.
+
+Each worker is a separate Python process with its own Gemini client and
+KeyBERT model, so CPU-bound work no longer serializes on one GIL. The router
+gives every new browser session an id and redirects it to a worker chosen by
+hashing that id, so the same session always lands on the same worker while
+it is up. Session state is saved to a shared SQLite store after every turn;
+if a worker dies the supervisor restarts it. The redirect leaves the browser
+connected to the worker's own port, so an open tab keeps reconnecting to
+that port until the worker is back, and then resumes from the store. Only a
+fresh visit to the router port (the same `?sid=` link) moves the session to
+the next healthy worker in the meantime.
+
+Usage:
+    python src/serve.py --workers 4 [--port 8501] [--store sessions.db]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import urllib.request
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+
+
+class Worker:
+    def __init__(self, index, port, address, env):
+        self.index = index
+        self.port = port
+        self.address = address
+        self.env = env
+        self.process = None
+        self.healthy = False
+        self.restarts = 0
+
+    def start(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", APP_PATH,
+             f"--server.port={self.port}", f"--server.address={self.address}",
+             "--server.headless=true"],
+            env=self.env,
+        )
+
+    def check(self):
+        """Restart the worker if it exited; refresh its health flag."""
+        if self.process.poll() is not None:
+            print(f"⚠️  Worker {self.index} exited with code {self.process.returncode}; restarting")
+            self.healthy = False
+            self.restarts += 1
+            self.start()
+            return
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=2) as response:
+                self.healthy = response.status == 200
+        except Exception:
+            self.healthy = False
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class Router:
+    """Maps session ids to workers: hash first, then the next healthy one."""
+
+    def __init__(self, workers):
+        self.workers = workers
+
+    def pick(self, session_id):
+        start = zlib.crc32(session_id.encode("utf-8")) % len(self.workers)
+        for offset in range(len(self.workers)):
+            worker = self.workers[(start + offset) % len(self.workers)]
+            if worker.healthy:
+                return worker
+        return self.workers[start]
+
+    def status(self):
+        return [{"worker": w.index, "port": w.port, "healthy": w.healthy, "restarts": w.restarts}
+                for w in self.workers]
+
+
+def make_handler(router):
+    class RouterHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/_router/status":
+                body = json.dumps(router.status()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            session_id = parse_qs(url.query).get("sid", [None])[0] or uuid.uuid4().hex
+            worker = router.pick(session_id)
+            host = (self.headers.get("Host") or "localhost").split(":")[0]
+            self.send_response(302)
+            self.send_header("Location", f"http://{host}:{worker.port}/?sid={session_id}")
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return RouterHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several Streamlit workers behind a sticky router.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--port", type=int, default=8501, help="router port; workers use the ports after it")
+    parser.add_argument("--address", default="0.0.0.0")
+    parser.add_argument("--store", default="sessions.db", help="SQLite file shared by the workers")
+    parser.add_argument("--threads-per-worker", type=int, default=1,
+                        help="KEYBERT_NUM_THREADS for each worker, to avoid oversubscribing the CPU")
+    args = parser.parse_args()
+
+    workers = []
+    for index in range(args.workers):
+        env = dict(os.environ,
+                   SESSION_STORE_PATH=os.path.abspath(args.store),
+                   WORKER_ID=str(index),
+                   KEYBERT_NUM_THREADS=str(args.threads_per_worker))
+        workers.append(Worker(index, args.port + 1 + index, args.address, env))
+    for worker in workers:
+        worker.start()
+
+    stopping = threading.Event()
+
+    def supervise():
+        while not stopping.wait(2.0):
+            for worker in workers:
+                worker.check()
+
+    threading.Thread(target=supervise, name="supervisor", daemon=True).start()
+
+    router = Router(workers)
+    server = ThreadingHTTPServer((args.address, args.port), make_handler(router))
+    print(f"🎯 Router on port {args.port}, {args.workers} workers on ports "
+          f"{args.port + 1}-{args.port + args.workers}")
+    print("⏹️  Press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping workers...")
+    finally:
+        stopping.set()
+        server.server_close()
+        for worker in workers:
+            worker.stop()
+
+
+if __name__ == "__main__":
+    main()
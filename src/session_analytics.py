@@ -0,0 +1,151 @@
+from array import array
+import csv
+import json
+import math
+
+
+class RunningStats:
+    """Streaming count, mean and variance (Welford), O(1) per update."""
+
+    __slots__ = ('count', 'mean', '_m2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def to_state(self):
+        return [self.count, self.mean, self._m2]
+
+    @classmethod
+    def from_state(cls, state):
+        stats = cls()
+        stats.count, stats.mean, stats._m2 = state
+        return stats
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class SessionAnalytics:
+    """
+    Per-candidate progress aggregates, updated once per answered turn.
+
+    Nothing here rescans chat history: each call to `record_turn` folds the
+    turn into running totals, and per-subtopic level trajectories are kept as
+    signed-byte arrays.
+    """
+
+    __slots__ = ('session_id', 'answers', 'clarifications', 'zero_knowledge',
+                 'scores', 'answer_seconds', 'trajectories')
+
+    def __init__(self, session_id=None):
+        self.session_id = session_id
+        self.answers = 0           # every evaluated reply, clarifications included
+        self.clarifications = 0
+        self.zero_knowledge = 0
+        self.scores = RunningStats()
+        self.answer_seconds = RunningStats()
+        self.trajectories = {}     # subtopic -> array('b') of levels answered at
+
+    def record_turn(self, subtopic, level, score, feedback_type, elapsed_seconds=None):
+        """Fold one evaluated reply into the aggregates."""
+        self.answers += 1
+        if elapsed_seconds is not None:
+            self.answer_seconds.update(elapsed_seconds)
+
+        if feedback_type == "clarification_request":
+            self.clarifications += 1
+            return
+        if feedback_type == "zero_knowledge":
+            self.zero_knowledge += 1
+
+        if score is not None:
+            self.scores.update(score)
+        if subtopic:
+            trajectory = self.trajectories.get(subtopic)
+            if trajectory is None:
+                trajectory = self.trajectories[subtopic] = array('b')
+            trajectory.append(level)
+
+    def to_state(self):
+        """Everything needed to rebuild these aggregates, as plain JSON types."""
+        return {
+            'session_id': self.session_id,
+            'answers': self.answers,
+            'clarifications': self.clarifications,
+            'zero_knowledge': self.zero_knowledge,
+            'scores': self.scores.to_state(),
+            'answer_seconds': self.answer_seconds.to_state(),
+            'trajectories': {s: list(t) for s, t in self.trajectories.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        analytics = cls(state['session_id'])
+        analytics.answers = state['answers']
+        analytics.clarifications = state['clarifications']
+        analytics.zero_knowledge = state['zero_knowledge']
+        analytics.scores = RunningStats.from_state(state['scores'])
+        analytics.answer_seconds = RunningStats.from_state(state['answer_seconds'])
+        analytics.trajectories = {s: array('b', t) for s, t in state['trajectories'].items()}
+        return analytics
+
+    def trajectory(self, subtopic):
+        """Levels the candidate answered at for `subtopic`, in order."""
+        return list(self.trajectories.get(subtopic, ()))
+
+    def summary(self):
+        answers = self.answers or 1
+        return {
+            'session_id': self.session_id,
+            'answers': self.answers,
+            'scored_answers': self.scores.count,
+            'mean_score': round(self.scores.mean, 2),
+            'score_std': round(self.scores.std, 2),
+            'mean_answer_seconds': round(self.answer_seconds.mean, 2),
+            'answer_seconds_std': round(self.answer_seconds.std, 2),
+            'clarification_rate': round(self.clarifications / answers, 3),
+            'zero_knowledge_rate': round(self.zero_knowledge / answers, 3),
+            'subtopics': len(self.trajectories),
+            'peak_level': max((max(t) for t in self.trajectories.values() if t), default=0),
+        }
+
+    def to_dict(self):
+        """Summary plus full trajectories, for JSON export."""
+        data = self.summary()
+        data['trajectories'] = {s: list(t) for s, t in self.trajectories.items()}
+        return data
+
+
+def export_cohort(sessions, path):
+    """
+    Write one row per session for cohort dashboards.
+
+    `.jsonl` paths get summaries with trajectories; anything else is written as
+    CSV with the summary columns only.
+    """
+    sessions = list(sessions)
+    if path.endswith('.jsonl'):
+        with open(path, 'w') as file:
+            for analytics in sessions:
+                file.write(json.dumps(analytics.to_dict()) + '\n')
+        return
+
+    fieldnames = list(SessionAnalytics().summary().keys())
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        for analytics in sessions:
+            writer.writerow(analytics.summary())
@@ -0,0 +1,109 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Set by serve.py for every worker; when unset, sessions live only in memory.
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH") or None
+
+
+class SessionStore:
+    """
+    Session state shared by every worker process on this machine.
+
+    A single SQLite file in WAL mode: readers never block the writer, and a
+    session saved by one worker can be picked up by any other, including a
+    restarted one. Small per-turn state is stored as one JSON document per
+    session; chat messages go in a separate table, one row per message, and
+    are only ever appended, so saving a turn costs the same at message 10 as
+    at message 1000.
+    """
+
+    def __init__(self, path=SESSION_STORE_PATH, timeout=10.0):
+        self.path = path
+        self._local = threading.local()
+        self._timeout = timeout
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " session_id TEXT PRIMARY KEY,"
+                " state TEXT NOT NULL,"
+                " worker TEXT,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                " session_id TEXT NOT NULL,"
+                " seq INTEGER NOT NULL,"
+                " message TEXT NOT NULL,"
+                " PRIMARY KEY (session_id, seq))"
+            )
+
+    def _connect(self):
+        # sqlite3 connections must stay on the thread that created them.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self._timeout)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id):
+        """Return the saved state for `session_id`, or None."""
+        row = self._connect().execute(
+            "SELECT state FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, session_id, state, worker=None):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, state, worker, updated_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(session_id) DO UPDATE SET"
+                " state = excluded.state, worker = excluded.worker, updated_at = excluded.updated_at",
+                (session_id, json.dumps(state), worker, time.time()),
+            )
+
+    def append_messages(self, session_id, messages, start):
+        """Store `messages` as positions `start`, `start + 1`, ... of the session's history."""
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO messages (session_id, seq, message) VALUES (?, ?, ?)",
+                [(session_id, start + i, json.dumps(message)) for i, message in enumerate(messages)],
+            )
+
+    def load_messages(self, session_id, limit=None):
+        """The session's messages in order; only the first `limit` if given."""
+        rows = self._connect().execute(
+            "SELECT message FROM messages WHERE session_id = ? AND seq < ? ORDER BY seq",
+            (session_id, limit if limit is not None else 2 ** 62),
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def delete(self, session_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+    def prune(self, max_age_seconds):
+        """Drop sessions not saved for `max_age_seconds`. Returns how many were removed."""
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM sessions WHERE updated_at < ?",
+                                  (time.time() - max_age_seconds,))
+            conn.execute("DELETE FROM messages WHERE session_id NOT IN (SELECT session_id FROM sessions)")
+            return cursor.rowcount
+
+
+_default_store = None
+
+
+def default_session_store():
+    """The store configured through SESSION_STORE_PATH, or None."""
+    global _default_store
+    if SESSION_STORE_PATH is None:
+        return None
+    if _default_store is None:
+        _default_store = SessionStore(SESSION_STORE_PATH)
+    return _default_store
@@ -3,6 +3,14 @@ import os
 from dotenv import load_dotenv
 from enhanced_chatbot import EnhancedChatbot
 from enhanced_evaluate import EnhancedEvaluator
+from model_router import ModelRouter
+from turn_pipeline import TurnPipeline
+from chat_history import ChatHistory
+from chat_render import chat_bubble_html, typing_frames
+from reference_answer import ReferenceAnswer
+from session_store import default_session_store
+import gemini_client
+import keywordextractor
 import time
 import random
 
@@ -136,11 +144,13 @@ st.markdown('<p class="sub-header">Master technical concepts through a dynamic l
 defaults = {
     "chatbot": None,
     "evaluator": None,
-    "chat_history": [],
+    "pipeline": None,
+    "chat_history": None,
     "session_started": False,
     "question_count": 0,
     "last_score": None,
     "last_concept": None,
+    "question_shown_at": None,
     "error_message": None,
 }
 for key, default in defaults.items():
@@ -148,10 +158,79 @@ for key, default in defaults.items():
         st.session_state[key] = default
 
 # Initialize heavy objects only once
+if st.session_state.get("router") is None:
+    st.session_state.router = ModelRouter()
+    # Load the Gemini client and keyword model while the welcome screen is up.
+    gemini_client.warm_up()
+    keywordextractor.warm_up()
 if st.session_state.chatbot is None:
-    st.session_state.chatbot = EnhancedChatbot()
+    st.session_state.chatbot = EnhancedChatbot(router=st.session_state.router)
 if st.session_state.evaluator is None:
-    st.session_state.evaluator = EnhancedEvaluator()
+    st.session_state.evaluator = EnhancedEvaluator(router=st.session_state.router)
+if st.session_state.chat_history is None:
+    st.session_state.chat_history = ChatHistory()
+if st.session_state.pipeline is None:
+    st.session_state.pipeline = TurnPipeline(st.session_state.chatbot, st.session_state.evaluator)
+
+# --- Shared session store (multi-process serving via serve.py) ---
+# The router pins each browser session to a worker with a `sid` query
+# parameter; state is saved after every turn so any worker can resume it.
+session_store = default_session_store()
+session_id = st.query_params.get("sid") if session_store is not None else None
+
+def save_session():
+    if session_id is None:
+        return
+    # Messages are appended once each; only the ones added this turn are written.
+    history = st.session_state.chat_history
+    saved_messages = st.session_state.get("saved_messages", 0)
+    if len(history) > saved_messages:
+        session_store.append_messages(
+            session_id, [history[i].to_dict() for i in range(saved_messages, len(history))], start=saved_messages)
+        st.session_state.saved_messages = len(history)
+
+    reference = st.session_state.get("display_correct_answer")
+    if reference and reference.ready:
+        saved_reference = {"text": reference.get()}
+    elif reference and reference.request:
+        saved_reference = {"request": reference.request}  # not generated yet; regenerated on demand
+    else:
+        saved_reference = None
+    session_store.save(session_id, {
+        "chatbot": st.session_state.chatbot.to_state(),
+        "messages": len(history),
+        "session_started": st.session_state.session_started,
+        "question_count": st.session_state.question_count,
+        "last_score": st.session_state.last_score,
+        "last_concept": st.session_state.last_concept,
+        "display_score": st.session_state.get("display_score"),
+        "display_feedback": st.session_state.get("display_feedback"),
+        "display_correct_answer": saved_reference,
+    }, worker=os.getenv("WORKER_ID"))
+
+def restore_session():
+    saved = session_store.load(session_id)
+    if saved is None:
+        return
+    st.session_state.chatbot.restore_state(saved["chatbot"])
+    for message in session_store.load_messages(session_id, limit=saved["messages"]):
+        message["streamed"] = True
+        st.session_state.chat_history.append(message)
+    st.session_state.saved_messages = len(st.session_state.chat_history)
+    for key in ["session_started", "question_count", "last_score", "last_concept",
+                "display_score", "display_feedback"]:
+        st.session_state[key] = saved[key]
+    reference = saved["display_correct_answer"]
+    if reference and "text" in reference:
+        st.session_state.display_correct_answer = ReferenceAnswer(reference["text"])
+    elif reference:
+        evaluator = st.session_state.evaluator
+        st.session_state.display_correct_answer = evaluator.count_deferred(
+            evaluator.reference_answer(**reference["request"]))
+
+if session_id is not None and not st.session_state.get("session_restored"):
+    restore_session()
+    st.session_state.session_restored = True
 
 def main():
         
@@ -171,7 +250,30 @@ def main():
                     f"**Questions Asked:** {st.session_state.question_count}\n\n"
                     f"**Topics in Queue:** {len(st.session_state.chatbot.topic_queue)}")
 
+            stats = progress.get('analytics', {})
+            if stats.get('scored_answers'):
+                st.caption(f"Average score: {stats['mean_score']} (±{stats['score_std']}) · "
+                           f"Avg. time per answer: {stats['mean_answer_seconds']}s · "
+                           f"Clarifications: {stats['clarification_rate']:.0%}")
+            reference = st.session_state.evaluator.reference_stats()
+            if reference['deferred']:
+                st.caption(f"Reference answers skipped: {reference['calls_avoided']} of "
+                           f"{reference['deferred']} (est. ~{reference['output_tokens_avoided_estimate']} tokens, "
+                           f"{reference['tokens_per_answer_source']} tokens/answer)")
+            tiers = st.session_state.router.stats()
+            if tiers:
+                st.caption("Model calls: " + " · ".join(
+                    f"{tier} {row['calls']} (${row['cost_usd']:.4f})" for tier, row in tiers.items()))
+
         if st.button("🔄 Reset Session"):
+            if st.session_state.pipeline is not None:
+                st.session_state.pipeline.close()
+            if st.session_state.chatbot is not None:
+                st.session_state.chatbot.close()
+            if st.session_state.chat_history is not None:
+                st.session_state.chat_history.close()
+            if session_id is not None:
+                session_store.delete(session_id)
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
             st.rerun()
@@ -188,6 +290,7 @@ def main():
                 bot_message = st.session_state.chatbot.get_next_question(st.session_state.chat_history)
                 bot_message["streamed"] = False
                 st.session_state.chat_history.append(bot_message)
+                save_session()
                 st.rerun()
             else:
                 st.session_state.error_message = "Please provide an introduction to get started!"
@@ -196,20 +299,19 @@ def main():
         # Chat display
         for message in st.session_state.chat_history:
             if message["role"] == "user":
-                st.markdown(f"<div class='chat-bubble-user'>{message['content']}</div>", unsafe_allow_html=True)
+                st.markdown(chat_bubble_html("user", message['content']), unsafe_allow_html=True)
             else:
                 if not message.get("streamed", False):
                     placeholder = st.empty()
-                    typed_text = ""
-                    for word in message["content"].split(" "):
-                        typed_text += word + " "
-                        placeholder.markdown(f"<div class='chat-bubble-bot'>{typed_text}</div>", unsafe_allow_html=True)
+                    for frame in typing_frames(message["content"]):
+                        placeholder.markdown(frame, unsafe_allow_html=True)
                         time.sleep(random.uniform(0.03, 0.07))
 
                     message["streamed"] = True
+                    st.session_state.question_shown_at = time.time()
 
                 else:
-                    st.markdown(f"<div class='chat-bubble-bot'>{message['content']}</div>", unsafe_allow_html=True)
+                    st.markdown(chat_bubble_html("assistant", message['content']), unsafe_allow_html=True)
 
         # Score
         if 'display_score' in st.session_state and st.session_state.display_score is not None:
@@ -222,7 +324,12 @@ def main():
 
         if 'display_correct_answer' in st.session_state and st.session_state.display_correct_answer:
             with st.expander("✅ Correct Answer"):
-                st.success(st.session_state.display_correct_answer)
+                reference = st.session_state.display_correct_answer
+                # Generated on demand: most users never open this expander.
+                if reference.ready:
+                    st.success(reference.get())
+                elif st.button("Show correct answer", key="show_correct_answer"):
+                    st.write_stream(reference.stream())
 
         # Answer input
         answer = st.text_area("✍️ Your Answer:", height=120, key="answer_input")
@@ -239,12 +346,20 @@ def main():
 
                 st.session_state.chat_history.append({"role": "user", "content": answer})
 
+                next_bot_message = None
                 if should_evaluate:
-                    score, feedback, correct_answer, feedback_type = st.session_state.evaluator.evaluate_answer(answer, current_question)
-                    st.session_state.chatbot.set_last_feedback_type(feedback_type)
+                    # Grading, the reference answer and the next question run concurrently.
+                    shown_at = st.session_state.question_shown_at
+                    turn = st.session_state.pipeline.run(
+                        answer, current_question, st.session_state.chat_history,
+                        time.time() - shown_at if shown_at else None
+                    )
+                    score, feedback = turn['score'], turn['feedback']
+                    correct_answer, feedback_type = turn['correct_answer'], turn['feedback_type']
+                    next_bot_message = turn['next_message']
                     if feedback_type != "clarification_request":
                         st.session_state.last_score = score
-                        st.session_state.last_concept = st.session_state.chatbot.process_user_response(answer, current_question)
+                        st.session_state.last_concept = turn['concept']
                         st.session_state.question_count += 1
                     if score is not None: st.session_state.display_score = score
                     if feedback: st.session_state.display_feedback = feedback
@@ -254,13 +369,15 @@ def main():
                         st.session_state.chatbot.topic_queue.append(('user_mentioned', answer))
                     st.session_state.last_score = None
 
-                next_bot_message = st.session_state.chatbot.get_next_question(
-                    st.session_state.chat_history,
-                    st.session_state.last_score,
-                    st.session_state.last_concept
-                )
+                if next_bot_message is None:
+                    next_bot_message = st.session_state.chatbot.get_next_question(
+                        st.session_state.chat_history,
+                        st.session_state.last_score,
+                        st.session_state.last_concept
+                    )
                 next_bot_message["streamed"] = False
                 st.session_state.chat_history.append(next_bot_message)
+                save_session()
                 st.rerun()
             else:
                 st.session_state.error_message = "Please provide an answer!"
@@ -0,0 +1,181 @@
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import threading
+
+TOPIC_GRAPH_PATH = os.getenv(
+    "TOPIC_GRAPH_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "topic_graph.json"),
+)
+# Minimum cosine similarity for mapping an unseen subtopic onto a graph node.
+TOPIC_GRAPH_MATCH_THRESHOLD = float(os.getenv("TOPIC_GRAPH_MATCH_THRESHOLD", "0.6"))
+
+# Embedding lookups for unseen subtopics run here, never on the request path.
+_resolve_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="topic-graph")
+
+
+def _normalize(name):
+    return " ".join(name.lower().replace("_", " ").split())
+
+
+class TopicGraph:
+    """
+    Prerequisite and related-concept graph over common interview subtopics.
+
+    Built offline (see build_topic_graph.py) and stored as JSON; loaded into
+    a compact index: one list of node names and, for each edge type, a CSR
+    pair of offset/target arrays. Subtopics that are not nodes or aliases are
+    mapped to the nearest node by embedding similarity, once per name. That
+    lookup needs the embedding model, so with `background` (the default) it
+    runs on a worker thread: the first `resolve` of an unseen subtopic returns
+    None at once and later calls get the match. The chatbot resolves each
+    subtopic when it is picked, well before a remedial level needs it.
+    """
+
+    def __init__(self, nodes, embed=None, match_threshold=TOPIC_GRAPH_MATCH_THRESHOLD, background=True):
+        self.names = []
+        self._ids = {}
+        for name, node in nodes.items():
+            self._add(name)
+            for target in node.get("prerequisites", []) + node.get("related", []):
+                self._add(target)
+
+        self._prereq_offsets, self._prereq_targets = self._build_csr(nodes, "prerequisites")
+        self._related_offsets, self._related_targets = self._build_csr(nodes, "related")
+
+        for name, node in nodes.items():
+            for alias in node.get("aliases", []):
+                self._ids.setdefault(_normalize(alias), self._ids[_normalize(name)])
+
+        self._embed = embed
+        self._vectors = None
+        self.match_threshold = match_threshold
+        self.background = background
+        self._resolved = {}  # unseen subtopic -> node id (or None)
+        self._resolving = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=TOPIC_GRAPH_PATH, **kwargs):
+        with open(path, "r") as file:
+            return cls(json.load(file)["nodes"], **kwargs)
+
+    def _add(self, name):
+        key = _normalize(name)
+        if key not in self._ids:
+            self._ids[key] = len(self.names)
+            self.names.append(name)
+
+    def _build_csr(self, nodes, edge_type):
+        edges = [[] for _ in self.names]
+        for name, node in nodes.items():
+            source = self._ids[_normalize(name)]
+            edges[source] = [self._ids[_normalize(t)] for t in node.get(edge_type, [])]
+        offsets = array('I', [0])
+        targets = array('I')
+        for neighbours in edges:
+            targets.extend(neighbours)
+            offsets.append(len(targets))
+        return offsets, targets
+
+    def __len__(self):
+        return len(self.names)
+
+    def resolve(self, subtopic):
+        """Node id for `subtopic`: exact name or alias first, then nearest embedding."""
+        if not subtopic:
+            return None
+        key = _normalize(subtopic)
+        node_id = self._ids.get(key)
+        if node_id is not None:
+            return node_id
+        with self._lock:
+            if key in self._resolved:
+                return self._resolved[key]
+            if key in self._resolving:
+                return None
+            self._resolving.add(key)
+        if self.background:
+            _resolve_executor.submit(self._resolve_unseen, key, subtopic)
+            return None
+        return self._resolve_unseen(key, subtopic)
+
+    def _resolve_unseen(self, key, subtopic):
+        node_id = self._nearest(subtopic)
+        with self._lock:
+            self._resolved[key] = node_id
+            self._resolving.discard(key)
+        return node_id
+
+    def _nearest(self, subtopic):
+        try:
+            import numpy as np
+            if self._embed is None:
+                # Whichever model the keyword backend already loads.
+                from keywordextractor import embed_phrases
+                self._embed = embed_phrases
+            if self._vectors is None:
+                self._vectors = np.asarray(self._embed(self.names), dtype=np.float32)
+            vector = np.asarray(self._embed([subtopic]), dtype=np.float32)[0]
+            similarities = self._vectors @ vector
+            best = int(np.argmax(similarities))
+            return best if similarities[best] >= self.match_threshold else None
+        except Exception as e:
+            print(f"Topic graph lookup error: {e}")
+            return None
+
+    def _neighbours(self, node_id, offsets, targets):
+        return targets[offsets[node_id]:offsets[node_id + 1]]
+
+    def prerequisite(self, subtopic, depth=1):
+        """
+        A concrete prerequisite `depth` steps below `subtopic`, or None if
+        `subtopic` is not in the graph.
+
+        Follows the first (most important) prerequisite at each step. At a
+        concept with no prerequisites of its own it moves on to the next
+        sibling instead, so each remedial level still gets a different node.
+        """
+        node_id = self.resolve(subtopic)
+        if node_id is None:
+            return None
+        siblings, position = self._neighbours(node_id, self._prereq_offsets, self._prereq_targets), 0
+        if not siblings:
+            return None
+        for _ in range(depth - 1):
+            children = self._neighbours(siblings[position], self._prereq_offsets, self._prereq_targets)
+            if children:
+                siblings, position = children, 0
+            elif position + 1 < len(siblings):
+                position += 1
+            else:
+                break
+        return self.names[siblings[position]]
+
+    def prerequisites(self, subtopic):
+        node_id = self.resolve(subtopic)
+        if node_id is None:
+            return []
+        return [self.names[i] for i in self._neighbours(node_id, self._prereq_offsets, self._prereq_targets)]
+
+    def related(self, subtopic):
+        node_id = self.resolve(subtopic)
+        if node_id is None:
+            return []
+        return [self.names[i] for i in self._neighbours(node_id, self._related_offsets, self._related_targets)]
+
+
+_default_graph = None
+
+
+def default_topic_graph():
+    """The graph at TOPIC_GRAPH_PATH, loaded once; None if it cannot be read."""
+    global _default_graph
+    if _default_graph is None:
+        try:
+            _default_graph = TopicGraph.load()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Topic graph not loaded: {e}")
+            _default_graph = False
+    return _default_graph or None
@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import os
+import time
+
+from enhanced_evaluate import is_obvious_non_answer
+from reference_answer import REFERENCE_ANSWER_MODE, ReferenceAnswer
+
+# Grade in parallel with classification (SPECULATIVE_GRADING=0 to turn off).
+# Saves the grading latency on real attempts, at the cost of a grading call
+# that is thrown away when the reply is a clarification request or "I don't know".
+SPECULATIVE_GRADING = os.getenv("SPECULATIVE_GRADING", "1") == "1"
+
+
+class StageTimings:
+    """Start/end offsets (ms from the start of the turn) of each pipeline stage."""
+
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.discarded = set()
+
+    def timed(self, name, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name, start, end):
+        with self._lock:
+            self.stages[name] = (round((start - self._t0) * 1000, 1), round((end - self._t0) * 1000, 1))
+
+    def summary(self):
+        """Per-stage durations, the wall-clock turn time, and what running the stages back to back would cost."""
+        wall_ms = round((time.perf_counter() - self._t0) * 1000, 1)
+        with self._lock:
+            stages = dict(self.stages)
+        durations = {name: round(end - start, 1) for name, (start, end) in stages.items()
+                     if name not in self.discarded}
+        sequential_ms = round(sum(durations.values()), 1)
+        return {
+            'stages': durations,
+            'discarded': sorted(self.discarded),
+            'offsets': stages,
+            'wall_ms': wall_ms,
+            'sequential_ms': sequential_ms,
+            'saved_ms': round(max(sequential_ms - wall_ms, 0.0), 1),
+        }
+
+
+class TurnPipeline:
+    """
+    Runs one answered turn as a small dependency graph instead of a chain.
+
+        classify ──┬──► ladder transition ─► next question ─► (reference answer prefetch)
+        grade ─────┘ (speculative)
+
+    Grading does not need the classification, so with `speculative_grading`
+    it starts at the same time and is discarded if the reply turns out to be
+    a clarification request or "I don't know"; a discarded grade is not
+    stored in the answer cache. Replies that are obviously not an attempt
+    ("idk", "skip", ...) are never graded speculatively. Once the feedback type and
+    score are known the ladder transition is fixed and the next question is
+    generated. A reference answer the grade did not include is returned as a
+    lazy handle; in "prefetch" mode it is generated in the background after
+    the turn, otherwise only when it is read. Keyword extraction is already
+    handed to the chatbot's background worker.
+    """
+
+    def __init__(self, chatbot, evaluator, speculative_grading=SPECULATIVE_GRADING, max_workers=2,
+                 reference_mode=REFERENCE_ANSWER_MODE):
+        self.chatbot = chatbot
+        self.evaluator = evaluator
+        self.speculative_grading = speculative_grading
+        self.reference_mode = reference_mode
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="turn-pipeline")
+        self.last_timings = None
+
+    def run(self, user_answer, question, chat_history, elapsed_seconds=None, concept=None):
+        """
+        Evaluate `user_answer` to `question` and produce the next bot message.
+
+        `chat_history` must already contain the user's answer. Returns a dict
+        with score, feedback, correct_answer (a ReferenceAnswer), feedback_type,
+        concept, next_message and timings.
+        """
+        timings = StageTimings()
+        # The subtopic and level the question was asked at; keys the answer cache.
+        ladder = self.chatbot.ladder_tracker
+        topic = (ladder.current_subtopic, ladder.current_level)
+        classify = self._executor.submit(timings.timed, 'classify',
+                                         self.evaluator.classify_response, user_answer, question)
+        grade = None
+        if self.speculative_grading and not is_obvious_non_answer(user_answer):
+            grade = self._executor.submit(timings.timed, 'grade', self.evaluator.grade_answer,
+                                          user_answer, question, concept, topic,
+                                          lambda: classify.result() == "attempt")
+
+        response_type = classify.result()
+        if response_type == "clarification_request":
+            result = (None, "Clarification requested", ReferenceAnswer(""), "clarification_request")
+            last_score = None
+        elif response_type == "zero_knowledge":
+            result = (0, "No answer provided.", self.evaluator.reference_answer(question, concept, score=0),
+                      "zero_knowledge")
+            last_score = 0
+        else:
+            if grade is None:
+                grade = self._executor.submit(timings.timed, 'grade', self.evaluator.grade_answer,
+                                              user_answer, question, concept, topic)
+            result = grade.result()
+            last_score = result[0]
+        if grade is not None and response_type != "attempt":
+            # The speculative grade is not used; it does not count towards the turn.
+            grade.cancel()
+            timings.discarded.add('grade')
+
+        score, feedback, correct_answer, feedback_type = result
+        self.evaluator.count_deferred(correct_answer)
+
+        # Same state updates, in the same order, as the sequential Submit handler.
+        self.chatbot.set_last_feedback_type(feedback_type)
+        self.chatbot.record_turn(score, feedback_type, elapsed_seconds)
+        current_concept = None
+        if feedback_type != "clarification_request":
+            current_concept = self.chatbot.process_user_response(user_answer, question)
+
+        next_message = timings.timed('next_question', self.chatbot.get_next_question,
+                                     chat_history, last_score, current_concept)
+
+        if self.reference_mode == "prefetch":
+            correct_answer.prefetch()
+
+        self.last_timings = timings.summary()
+        return {
+            'score': score,
+            'feedback': feedback,
+            'correct_answer': correct_answer,
+            'feedback_type': feedback_type,
+            'concept': current_concept,
+            'next_message': next_message,
+            'timings': self.last_timings,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
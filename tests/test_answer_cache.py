@@ -0,0 +1,36 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from answer_cache import SemanticAnswerCache  # noqa: E402
+
+TOPIC = ("docker", 2)
+BUILDS = "L+2: How do you make Docker image builds reproducible?"
+BUILDS_REWORDED = "L+2: How would you make Docker builds reproducible?"
+NETWORKING = "L+2: How do containers on different Docker networks talk to each other?"
+ANSWER = "Pin base image digests and dependency versions, and use multi-stage builds."
+
+VECTORS = {
+    ANSWER: [1.0, 0.0, 0.0],
+    "how do you make docker image builds reproducible?": [0.0, 1.0, 0.0],
+    "how would you make docker builds reproducible?": [0.0, 0.99, 0.14],
+    "how do containers on different docker networks talk to each other?": [0.0, 0.3, 0.95],
+}
+
+
+def make_cache():
+    cache = SemanticAnswerCache(threshold=0.95, question_threshold=0.9, embed=lambda text: VECTORS[text])
+    cache.store(BUILDS, ANSWER, (85, "Great answer!", "Pin everything.", "excellent"), topic=TOPIC)
+    return cache
+
+
+def test_answer_is_not_reused_for_a_different_question_on_the_same_topic():
+    cache = make_cache()
+    assert cache.lookup(NETWORKING, ANSWER, topic=TOPIC) is None
+    assert cache.stats()['hits'] == 0
+
+
+def test_reworded_question_reuses_the_grade_but_not_the_reference_answer():
+    cache = make_cache()
+    assert cache.lookup(BUILDS, ANSWER, topic=TOPIC) == (85, "Great answer!", "Pin everything.", "excellent")
+    assert cache.lookup(BUILDS_REWORDED, ANSWER, topic=TOPIC) == (85, "Great answer!", None, "excellent")
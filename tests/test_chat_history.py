@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+from chat_history import ChatHistory, ChatMessage
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = ChatHistory(max_messages=3, directory=str(tmp_path))
+    for i in range(7):
+        history.append({"role": "user" if i % 2 else "assistant", "content": f"message {i}"})
+    yield history
+    history.close()
+
+
+def contents(messages):
+    return [message["content"] for message in messages]
+
+
+def test_messages_past_max_messages_spill_to_the_archive(history):
+    assert len(history) == 7
+    assert contents(history.recent()) == ["message 4", "message 5", "message 6"]
+    assert contents(history.iter_archived()) == [f"message {i}" for i in range(4)]
+    assert os.path.getsize(history.path) > 0
+
+
+def test_getitem_across_the_archive_and_live_boundary(history):
+    assert [history[i]["content"] for i in range(7)] == [f"message {i}" for i in range(7)]
+    assert history[3]["content"] == "message 3"  # last archived
+    assert history[4]["content"] == "message 4"  # first live
+    assert history[-4]["content"] == "message 3"
+    assert history[-3]["content"] == "message 4"
+    assert history[-7]["content"] == "message 0"
+    assert history[1]["role"] == "user"
+    with pytest.raises(IndexError):
+        history[7]
+    with pytest.raises(IndexError):
+        history[-8]
+
+
+def test_iteration_order_forwards_and_reversed(history):
+    assert contents(history) == [f"message {i}" for i in range(7)]
+    assert contents(reversed(history)) == [f"message {i}" for i in reversed(range(7))]
+
+
+def test_messages_appended_after_a_read_are_still_found(history):
+    assert history[0]["content"] == "message 0"  # maps the segment file
+    for i in range(7, 10):
+        history.append(ChatMessage("user", f"message {i}"))
+    assert history[6]["content"] == "message 6"
+    assert contents(history) == [f"message {i}" for i in range(10)]
+
+
+def test_export_writes_the_whole_conversation(history, tmp_path):
+    path = tmp_path / "export.jsonl"
+    history.export(str(path))
+    with open(path) as file:
+        rows = [json.loads(line) for line in file]
+    assert rows == [{"role": "user" if i % 2 else "assistant", "content": f"message {i}"} for i in range(7)]
+
+
+def test_close_deletes_the_segment_file(tmp_path):
+    history = ChatHistory(max_messages=1, directory=str(tmp_path))
+    history.append({"role": "user", "content": "a"})
+    history.append({"role": "user", "content": "b"})
+    history[0]
+    assert os.path.exists(history.path)
+    history.close()
+    assert not os.path.exists(history.path)
+    history.close()  # a second close is a no-op
+
+    kept = ChatHistory(max_messages=1, directory=str(tmp_path))
+    kept.close(delete=False)
+    assert os.path.exists(kept.path)
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import keyword_worker  # noqa: E402
+from enhanced_chatbot import KEYWORD_WAIT_SECONDS, EnhancedChatbot  # noqa: E402
+from keyword_worker import BackgroundKeywordExtractor  # noqa: E402
+from model_router import ModelRouter, TIER_ORDER  # noqa: E402
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Model:
+    def generate_content(self, prompt, **kwargs):
+        return _Response("What is a Dockerfile?")
+
+
+def test_subtopic_switch_does_not_wait_for_a_slow_extraction(monkeypatch):
+    release = threading.Event()
+
+    def slow_extract(texts, backend=None):
+        release.wait(timeout=5)
+        return [["docker"] for _ in texts]
+
+    monkeypatch.setattr(keyword_worker, "extract_keywords_batch", slow_extract)
+    chatbot = EnhancedChatbot(router=ModelRouter(models={tier: _Model() for tier in TIER_ORDER}))
+    chatbot.keyword_worker = BackgroundKeywordExtractor()
+    chatbot.topic_graph = None
+    chatbot.session_started = True
+    try:
+        chatbot.keyword_worker.submit("I containerised our services with Docker")
+
+        start = time.perf_counter()
+        reply = chatbot.get_next_question([{'role': 'user', 'content': "hi"}])
+        assert time.perf_counter() - start < KEYWORD_WAIT_SECONDS + 0.5
+        assert reply['evaluate'] is False  # asks for a new area instead of blocking
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while chatbot.keyword_worker.pending_count() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        reply = chatbot.get_next_question([{'role': 'user', 'content': "hi"}])
+        assert reply == {'content': "L0: What is a Dockerfile?", 'evaluate': True, 'role': 'assistant'}
+        assert chatbot.ladder_tracker.current_subtopic == "docker"
+    finally:
+        release.set()
+        chatbot.close()
@@ -0,0 +1,51 @@
+import threading
+
+import keyword_worker
+from keyword_worker import BackgroundKeywordExtractor
+
+
+def test_pending_never_exceeds_bound_with_slow_extractor(monkeypatch):
+    release = threading.Event()
+
+    def slow_extract(texts, backend=None):
+        release.wait(timeout=5)
+        return [[text] for text in texts]
+
+    monkeypatch.setattr(keyword_worker, "extract_keywords_batch", slow_extract)
+    worker = BackgroundKeywordExtractor(max_pending=2, submit_timeout=0.05)
+    try:
+        accepted = []
+        for i in range(8):
+            if i == 3:
+                release.set()
+            accepted.append(worker.submit(f"answer {i}"))
+            assert worker.pending_count() <= worker.max_pending
+        results = worker.flush(timeout=5)
+        assert len(results) == accepted.count(True)
+        assert worker.dropped == accepted.count(False)
+        assert worker.dropped >= 1  # the first extraction blocks until i == 3
+    finally:
+        worker.shutdown(timeout=1)
+
+
+def test_texts_queued_during_an_extraction_are_batched(monkeypatch):
+    release = threading.Event()
+    batches = []
+
+    def extract(texts, backend=None):
+        batches.append(list(texts))
+        release.wait(timeout=5)
+        return [[text] for text in texts]
+
+    monkeypatch.setattr(keyword_worker, "extract_keywords_batch", extract)
+    worker = BackgroundKeywordExtractor(max_pending=8)
+    try:
+        for i in range(4):
+            assert worker.submit(f"answer {i}")
+        release.set()
+        assert worker.flush(timeout=5) == [[f"answer {i}"] for i in range(4)]
+        assert worker.pending_count() == 0
+        assert sum(len(batch) for batch in batches) == 4
+        assert len(batches) < 4
+    finally:
+        worker.shutdown(timeout=1)
@@ -0,0 +1,105 @@
+import gc
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from ladder_store import LadderStore  # noqa: E402
+from ladder_tracker import LadderTracker  # noqa: E402
+
+
+def test_row_shared_by_two_trackers_survives_one_being_collected():
+    store = LadderStore()
+    first = LadderTracker(store, session_id="shared")
+    second = LadderTracker(store, session_id="shared")
+    second.current_level = 2
+    del first
+    gc.collect()
+
+    other = LadderTracker(store, session_id="other")
+    other.current_level = -3
+    assert second.current_level == 2
+    assert "shared" in store
+
+    del second
+    gc.collect()
+    assert "shared" not in store
+
+
+def test_subtopic_names_are_freed_when_no_session_uses_them():
+    store = LadderStore()
+    first = store.add_session("a")
+    second = store.add_session("b")
+    store.set_subtopic(first, "docker")
+    store.set_subtopic(second, "docker")
+    store.set_subtopic(first, "a whole free-text answer about something new")
+    assert store.memory_usage()['subtopics'] == 2
+
+    store.reset(["a", "a"])
+    store.release_session("b")
+    assert store.memory_usage()['subtopics'] == 0
+
+    third = store.add_session("c")
+    store.set_subtopic(third, "kubernetes")
+    assert store.get_subtopic(third) == "kubernetes"
+    assert len(store._subtopic_names) == 2  # freed ids are reused
+
+
+def test_store_grows_past_its_initial_capacity():
+    store = LadderStore(capacity=2)
+    rows = [store.add_session(f"s{i}") for i in range(5)]
+    store.set_level(rows[0], 2)
+    store.set_subtopic(rows[4], "docker")
+    assert store.memory_usage()['capacity'] >= 5
+    assert store.get_level(rows[0]) == 2
+    assert store.get_subtopic(rows[4]) == "docker"
+    assert store.go_up_row(rows[4])
+    assert store.get_level(rows[4]) == 1
+
+
+def test_released_row_is_reused_at_l0_with_no_subtopic():
+    store = LadderStore()
+    row = store.add_session("old")
+    store.set_level(row, -2)
+    store.set_subtopic(row, "sql")
+    store.release_session("old")
+
+    assert store.add_session("new") == row
+    assert store.get_level(row) == 0
+    assert store.get_subtopic(row) is None
+    assert len(store) == 1
+
+
+def test_batch_moves_are_clamped_at_the_ladder_ends():
+    store = LadderStore()
+    for session_id in ("a", "b"):
+        store.add_session(session_id)
+    store.set_level(store.row("a"), 3)
+    store.set_level(store.row("b"), -3)
+
+    assert store.go_up(["a", "b"]).tolist() == [False, True]
+    assert store.go_down(["a", "b"]).tolist() == [True, True]
+    assert store.go_down(["a", "b"]).tolist() == [True, False]
+    assert store.levels(["a", "b"]).tolist() == [1, -3]
+    for _ in range(10):
+        store.go_up(["a", "b"])
+    assert store.levels(["a", "b"]).tolist() == [3, 3]
+
+
+def test_session_listed_twice_in_one_batch_moves_once():
+    store = LadderStore()
+    store.add_session("a")
+    store.go_up(["a", "a", "a"])
+    assert store.levels(["a"]).tolist() == [1]
+    store.go_down(["a", "a"])
+    assert store.levels(["a"]).tolist() == [0]
+
+
+def test_scalar_row_moves_match_the_tracker_contract():
+    tracker = LadderTracker(LadderStore())
+    assert [tracker.go_up_ladder() for _ in range(4)] == [True, True, True, False]
+    assert tracker.current_level == 3
+    assert [tracker.go_down_ladder() for _ in range(7)] == [True] * 6 + [False]
+    assert tracker.current_level == -3
+    tracker.assign_subtopic("overfitting", reset=True)
+    assert tracker.get_status() == {'subtopic': 'overfitting', 'level': 0}
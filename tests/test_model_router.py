@@ -0,0 +1,46 @@
+import pytest
+
+from model_router import ModelRouter, TIER_ORDER
+
+TIERS = {'lite': 'flash-lite', 'standard': 'flash-lite', 'strong': 'flash'}
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Model:
+    def __init__(self, text=None, error=None):
+        self.text = text
+        self.error = error
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return _Response(self.text)
+
+
+def make_router(models, retries=1):
+    return ModelRouter(tiers=TIERS, routes={'grade': 'lite'}, prices={}, models=models,
+                       retries=retries, retry_delay=0)
+
+
+def test_transport_errors_are_retried_on_the_same_tier_then_raised():
+    models = {tier: _Model(error=ConnectionError("429")) for tier in TIER_ORDER}
+    router = make_router(models, retries=2)
+    with pytest.raises(ConnectionError):
+        router.generate('grade', "prompt", validate=lambda r: True)
+    assert [models[tier].calls for tier in TIER_ORDER] == [3, 0, 0]
+    assert router.stats()['lite']['escalations'] == 0
+
+
+def test_rejected_responses_escalate_skipping_tiers_with_the_same_model():
+    models = {'lite': _Model("no score"), 'standard': _Model("no score"), 'strong': _Model("Score: 80")}
+    router = make_router(models)
+    response = router.generate('grade', "prompt", validate=lambda r: r.text.startswith("Score:"))
+    assert response.text == "Score: 80"
+    assert [models[tier].calls for tier in TIER_ORDER] == [1, 0, 1]
+    assert router.stats(by='call')['grade']['escalations'] == 1
@@ -0,0 +1,96 @@
+import pytest
+
+from reference_answer import ReferenceAnswer
+
+
+def make_counting_generator(chunks):
+    calls = []
+
+    def generate():
+        calls.append(1)
+        yield from chunks
+
+    return generate, calls
+
+
+def test_closing_stream_early_finishes_generation_once():
+    generate, calls = make_counting_generator(["Dropout ", "drops ", "units."])
+    reference = ReferenceAnswer(generate=generate)
+
+    stream = reference.stream()
+    assert next(stream) == "Dropout "
+    stream.close()  # no "generator ignored GeneratorExit"
+
+    assert reference.get() == "Dropout drops units."
+    assert reference.ready
+    assert len(calls) == 1
+
+
+def test_stream_then_get_returns_cached_text():
+    generate, calls = make_counting_generator(["a", "b"])
+    reference = ReferenceAnswer(generate=generate)
+    assert "".join(reference.stream()) == "ab"
+    assert reference.get() == "ab"
+    assert len(calls) == 1
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _StubModel:
+    def generate_content(self, prompt, stream=False, **kwargs):
+        return iter([_Chunk("First part. "), _Chunk("Second part.")])
+
+
+def test_evaluator_reference_stream_closed_early_is_counted_once():
+    pytest.importorskip("numpy")
+    from enhanced_evaluate import EnhancedEvaluator
+    from model_router import ModelRouter, TIER_ORDER
+
+    router = ModelRouter(models={tier: _StubModel() for tier in TIER_ORDER})
+    evaluator = EnhancedEvaluator(answer_cache=None, router=router)
+    reference = evaluator.count_deferred(evaluator.reference_answer("What is dropout?", score=40))
+
+    stream = reference.stream()
+    next(stream)
+    stream.close()
+
+    assert reference.get() == "First part. Second part."
+    assert router.stats(by='call')['reference_answer']['calls'] == 1
+    stats = evaluator.reference_stats()
+    assert stats['deferred'] == 1
+    assert stats['generated'] == 1
+    assert stats['calls_avoided'] == 0
+
+
+def test_unreturned_reference_handles_are_not_counted_as_deferred():
+    pytest.importorskip("numpy")
+    from enhanced_evaluate import EnhancedEvaluator
+    from model_router import ModelRouter, TIER_ORDER
+
+    router = ModelRouter(models={tier: _StubModel() for tier in TIER_ORDER})
+    evaluator = EnhancedEvaluator(answer_cache=None, router=router)
+    evaluator.reference_answer("What is dropout?")  # e.g. from a discarded speculative grade
+    evaluator.count_deferred(evaluator.reference_answer("What is a hash table?"))
+    evaluator.count_deferred(ReferenceAnswer("already known"))
+
+    assert evaluator.reference_stats()['deferred'] == 1
+
+
+def test_tokens_avoided_fall_back_to_the_prior_before_any_answer_is_generated():
+    pytest.importorskip("numpy")
+    import enhanced_evaluate
+    from enhanced_evaluate import EnhancedEvaluator
+    from model_router import ModelRouter, TIER_ORDER
+
+    router = ModelRouter(models={tier: _StubModel() for tier in TIER_ORDER})
+    evaluator = EnhancedEvaluator(answer_cache=None, router=router)
+    for question in ("What is dropout?", "What is a hash table?"):
+        evaluator.count_deferred(evaluator.reference_answer(question))
+
+    stats = evaluator.reference_stats()
+    assert stats['calls_avoided'] == 2
+    assert stats['tokens_per_answer_source'] == 'prior'
+    assert stats['output_tokens_avoided_estimate'] == 2 * enhanced_evaluate.REFERENCE_ANSWER_TOKENS_PRIOR
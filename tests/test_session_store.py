@@ -0,0 +1,26 @@
+from session_store import SessionStore
+
+
+def test_messages_are_appended_and_loaded_in_order(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    store.append_messages("s1", [{"role": "user", "content": "hi"}], start=0)
+    store.append_messages("s1", [{"role": "assistant", "content": "L0: q1"},
+                                 {"role": "user", "content": "a1"}], start=1)
+    store.save("s1", {"messages": 3})
+
+    assert [m["content"] for m in store.load_messages("s1")] == ["hi", "L0: q1", "a1"]
+    assert [m["content"] for m in store.load_messages("s1", limit=2)] == ["hi", "L0: q1"]
+    assert store.load_messages("other") == []
+
+
+def test_delete_and_prune_remove_messages(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    for session_id in ("old", "new"):
+        store.append_messages(session_id, [{"role": "user", "content": session_id}], start=0)
+        store.save(session_id, {"messages": 1})
+    store.delete("new")
+    assert store.load("new") is None
+    assert store.load_messages("new") == []
+
+    assert store.prune(max_age_seconds=-1) == 1
+    assert store.load_messages("old") == []
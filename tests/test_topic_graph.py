@@ -0,0 +1,33 @@
+import threading
+
+import pytest
+
+from topic_graph import TopicGraph
+
+NODES = {
+    "docker": {"prerequisites": ["containers", "linux processes"], "related": ["kubernetes"],
+               "aliases": ["docker engine"]},
+    "containers": {"prerequisites": ["linux processes"], "related": []},
+}
+
+
+def test_unseen_subtopic_is_resolved_off_the_calling_thread():
+    np = pytest.importorskip("numpy")
+    embedded_on = []
+    names = ["docker", "containers", "linux processes", "kubernetes"]
+
+    def embed(texts):
+        embedded_on.append(threading.current_thread().name)
+        index = {"docker containers": 0}
+        return np.array([np.eye(len(names))[index.get(t, names.index(t) if t in names else 3)]
+                         for t in texts], dtype=np.float32)
+
+    graph = TopicGraph(NODES, embed=embed)
+    assert graph.resolve("docker engine") == graph.resolve("docker")  # alias, no embedding
+    assert embedded_on == []
+
+    assert graph.prerequisite("docker containers") is None  # not resolved yet
+    from topic_graph import _resolve_executor
+    _resolve_executor.submit(lambda: None).result(timeout=5)  # wait for the lookup
+    assert graph.prerequisite("docker containers") == "containers"
+    assert embedded_on and threading.current_thread().name not in embedded_on
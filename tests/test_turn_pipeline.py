@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import keyword_worker  # noqa: E402
+from answer_cache import SemanticAnswerCache  # noqa: E402
+from enhanced_chatbot import EnhancedChatbot  # noqa: E402
+from enhanced_evaluate import EnhancedEvaluator  # noqa: E402
+from model_router import ModelRouter, TIER_ORDER  # noqa: E402
+from turn_pipeline import TurnPipeline  # noqa: E402
+
+QUESTION = "L+2: How would you make Docker builds reproducible in CI?"
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Model:
+    """Answers each prompt by what it asks for, like the real call types."""
+
+    def __init__(self, classification):
+        self.classification = classification
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        if "Classify the response" in prompt:
+            time.sleep(0.05)  # let the speculative grade get going first
+            text = self.classification
+        elif "SCORING RULES" in prompt:
+            text = "Score: 90\nFeedback: Great answer!\nAnswer: Pin image digests."
+        elif "asked for clarification" in prompt:
+            text = "Put differently: how do you get the same image from every build?"
+        else:
+            text = "What is a Kubernetes pod?"
+        return iter([_Response(text)]) if stream else _Response(text)
+
+
+def make_session(classification):
+    router = ModelRouter(models={tier: _Model(classification) for tier in TIER_ORDER})
+    chatbot = EnhancedChatbot(router=router)
+    chatbot.topic_graph = None
+    chatbot.session_started = True
+    chatbot.topic_queue = [('initial', 'kubernetes')]
+    chatbot.ladder_tracker.assign_subtopic("docker", reset=True)
+    chatbot.ladder_tracker.current_level = 2
+    cache = SemanticAnswerCache(embed=lambda text: [len(text), 1.0, 0.0])
+    evaluator = EnhancedEvaluator(answer_cache=cache, router=router)
+    history = [{'role': 'assistant', 'content': QUESTION}]
+    return chatbot, evaluator, router, history
+
+
+def run_sequential(chatbot, evaluator, user_answer, history):
+    """The Submit handler without the pipeline: classify, then grade, then update."""
+    score, feedback, correct_answer, feedback_type = evaluator.evaluate_answer(user_answer, QUESTION)
+    chatbot.set_last_feedback_type(feedback_type)
+    chatbot.record_turn(score, feedback_type)
+    concept = None
+    if feedback_type != "clarification_request":
+        concept = chatbot.process_user_response(user_answer, QUESTION)
+    last_score = None if feedback_type == "clarification_request" else score
+    return chatbot.get_next_question(history + [{'role': 'user', 'content': user_answer}], last_score, concept)
+
+
+@pytest.mark.parametrize("user_answer, classification", [
+    ("Sorry, could you ask that another way?", "clarification_request"),
+    ("No clue, honestly.", "zero_knowledge"),
+])
+def test_discarded_speculative_grade(monkeypatch, user_answer, classification):
+    monkeypatch.setattr(keyword_worker, "extract_keywords_batch", lambda texts, backend=None: [[] for _ in texts])
+
+    chatbot, evaluator, router, history = make_session(classification)
+    pipeline = TurnPipeline(chatbot, evaluator, speculative_grading=True, reference_mode="lazy")
+    try:
+        turn = pipeline.run(user_answer, QUESTION, history + [{'role': 'user', 'content': user_answer}])
+    finally:
+        pipeline._executor.shutdown(wait=True)  # let the speculative grade finish
+        chatbot.close()
+
+    assert router.stats(by='call')['grade']['calls'] == 1  # it did run
+    assert turn['feedback_type'] == classification
+    assert 'grade' not in turn['timings']['stages']
+    assert turn['timings']['discarded'] == ['grade']
+    assert evaluator.answer_cache.stats()['answers'] == 0
+
+    sequential_chatbot, sequential_evaluator, _, _ = make_session(classification)
+    try:
+        expected = run_sequential(sequential_chatbot, sequential_evaluator, user_answer, history)
+    finally:
+        sequential_chatbot.close()
+    assert turn['next_message'] == expected
+    assert chatbot.ladder_tracker.get_status() == sequential_chatbot.ladder_tracker.get_status()